@@ -1,18 +1,35 @@
-from fastapi import FastAPI, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import Dict, List, Any, Optional
 import pandas as pd
 import numpy as np
 import io
+import os
 import json
 import uuid
+import math
+import asyncio
+import multiprocessing
+import tempfile
+import orjson
+import openpyxl
+import plotly.io as pio
+import hashlib
+import logging
+import threading
+import time
+import pyarrow as pa
+import pyarrow.feather as feather
+from collections import OrderedDict
+from contextvars import ContextVar
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import singledispatch
 from datetime import datetime
 
-import sys
-sys.path.insert(0, '..')
-
 from modules.data_analyzer import ColumnAnalyzer
 from modules.cleaning_engine import DataCleaningEngine
 from modules.anomaly_detector import AnomalyDetector
@@ -21,7 +38,68 @@ from modules.hypothesis_analysis import HypothesisAnalyzer
 from modules.data_balancer import DataBalancer
 from modules.report_generator import ReportGenerator
 
-app = FastAPI(title="Renvo AI - Data Cleaning API", version="1.0.0")
+logger = logging.getLogger(__name__)
+
+# Shared across requests: these keep no per-call state. DataBalancer (per-call label encoder),
+# ColumnAnalyzer (unbounded result cache), DataVisualizer (correlation cache keyed only on shape)
+# and HypothesisAnalyzer with a custom alpha are still created per call.
+CLEANING_ENGINE = DataCleaningEngine()
+ANOMALY_DETECTOR = AnomalyDetector()
+# Hypothesis tests run in pool workers that already own a core each, so no extra threads.
+# Frames arrive pickled with fresh buffers on every request, so the crosstab cache would never
+# hit and would only keep columns of evicted datasets alive; it is disabled here.
+HYPOTHESIS_ANALYZER = HypothesisAnalyzer(max_workers=1, max_cached_crosstabs=0)
+
+if int(pd.__version__.split(".")[0]) < 3:
+    # Copy-on-Write is always on from pandas 3, where the option is deprecated.
+    pd.set_option("mode.copy_on_write", True)
+
+# Figures are serialized with orjson; plotly already emits numpy-backed trace arrays
+# as base64 typed arrays ({"dtype", "bdata", "shape"}) which plotly.js decodes natively.
+pio.json.config.default_engine = "orjson"
+
+def _orjson_default(obj):
+    """Fallback for values orjson cannot encode natively (pandas scalars, object arrays)."""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+        if isinstance(obj, float) and not math.isfinite(obj):
+            return None
+        return obj
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    return str(obj)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered by orjson, which encodes numpy scalars/arrays and datetimes in C."""
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+
+POOL_WORKERS = os.cpu_count() or 1
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # forkserver: forking the already multi-threaded server process can deadlock workers.
+    app.state.pool = ProcessPoolExecutor(
+        max_workers=POOL_WORKERS,
+        mp_context=multiprocessing.get_context("forkserver")
+    )
+    yield
+    app.state.pool.shutdown(cancel_futures=True)
+
+app = FastAPI(
+    title="Renvo AI - Data Cleaning API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,54 +109,337 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-sessions: Dict[str, Dict[str, Any]] = {}
+SESSION_DIR = os.environ.get("SESSION_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "sessions"))
+MAX_HOT_SESSIONS = int(os.environ.get("MAX_HOT_SESSIONS", "32"))
+SESSION_IDLE_TTL_SECONDS = int(os.environ.get("SESSION_IDLE_TTL_SECONDS", "3600"))
+MAX_AI_ASSISTANTS = int(os.environ.get("MAX_AI_ASSISTANTS", "256"))
+# Recently written version files may not be referenced by the metadata yet, so GC leaves them alone.
+VERSION_GC_GRACE_SECONDS = 60
+
+_FRAME_KEYS = ("dataset", "original_dataset", "train_data", "test_data")
+
+# Sessions handed out during the current request, keyed by id; persisted by the middleware below.
+_request_sessions: ContextVar[Optional[Dict[str, Dict[str, Any]]]] = ContextVar("_request_sessions", default=None)
+
+class SessionStore:
+    """Disk-backed session map shared by all workers that point at the same SESSION_DIR.
+
+    Every dataset version is written once as an immutable Feather file; the session
+    metadata (column types, history, undo/redo paths, ...) is JSON, replaced atomically
+    at the end of each request that touched the session. Only the most recently used
+    sessions are kept in memory, and any idle for longer than `idle_ttl` seconds are
+    dropped (they reload from disk on next access). Two workers mutating the same session concurrently
+    is last-writer-wins on the metadata.
+    """
+
+    def __init__(self, root: str, max_hot: int, idle_ttl: float):
+        self.root = root
+        self.max_hot = max_hot
+        self.idle_ttl = idle_ttl
+        self._hot: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._last_access: Dict[str, float] = {}
+        self._in_use: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+    def _session_dir(self, session_id: str) -> str:
+        return os.path.join(self.root, hashlib.sha256(session_id.encode()).hexdigest())
+
+    def _meta_path(self, session_id: str) -> str:
+        return os.path.join(self._session_dir(session_id), "session.json")
+
+    def _disk_mtime(self, session_id: str) -> Optional[int]:
+        try:
+            return os.stat(self._meta_path(session_id)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            if session_id in self._hot:
+                return True
+        return self._disk_mtime(session_id) is not None
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            session = self._hot.get(session_id)
+            disk_mtime = self._disk_mtime(session_id)
+            if session is not None and (disk_mtime is None or disk_mtime == session.get("_persisted_mtime")):
+                self._hot.move_to_end(session_id)
+                self._last_access[session_id] = time.monotonic()
+                return session
+            if disk_mtime is None:
+                return None
+            # Not loaded yet, or another worker has written a newer version.
+            session = self._load(session_id)
+            self.add(session)
+            return session
+
+    def add(self, session: Dict[str, Any]):
+        with self._lock:
+            self._hot[session["session_id"]] = session
+            self._hot.move_to_end(session["session_id"])
+            self._last_access[session["session_id"]] = time.monotonic()
+            self._evict(keep=session["session_id"])
+
+    def _evict(self, keep: Optional[str] = None):
+        """Drop least recently used sessions over `max_hot`, and any idle past `idle_ttl`."""
+        now = time.monotonic()
+        for session_id in list(self._hot):
+            # Sessions still held by an in-flight request stay hot so their writes are not lost.
+            if session_id == keep or self._in_use.get(session_id):
+                continue
+            idle = now - self._last_access.get(session_id, now)
+            if len(self._hot) > self.max_hot or idle > self.idle_ttl:
+                self._drop(session_id, idle)
+
+    def _drop(self, session_id: str, idle: float):
+        session = self._hot.pop(session_id)
+        self._last_access.pop(session_id, None)
+        # Release frames and in-memory snapshots now rather than whenever the last stray reference goes.
+        for key in _FRAME_KEYS:
+            session[key] = None
+        session["undo_stack"].clear()
+        session["redo_stack"].clear()
+        session["_stats_cache"].clear()
+        logger.info("Evicted session %s from memory after %.0fs idle", session_id, idle)
+
+    def acquire(self, session: Dict[str, Any]):
+        touched = _request_sessions.get()
+        if touched is None or session["session_id"] in touched:
+            return
+        touched[session["session_id"]] = session
+        with self._lock:
+            self._in_use[session["session_id"]] = self._in_use.get(session["session_id"], 0) + 1
+
+    def release(self, touched: Dict[str, Dict[str, Any]]):
+        for session_id, session in touched.items():
+            try:
+                self.save(session)
+            finally:
+                with self._lock:
+                    remaining = self._in_use.get(session_id, 0) - 1
+                    if remaining > 0:
+                        self._in_use[session_id] = remaining
+                    else:
+                        self._in_use.pop(session_id, None)
+                    self._evict()
+
+    def write_frame(self, session_id: str, df: pd.DataFrame) -> Optional[str]:
+        """Write `df` as a new immutable version file; None if Arrow cannot represent it."""
+        if not all(isinstance(column, str) for column in df.columns):
+            logger.warning("Session %s: dataset has non-string column labels, version not persisted", session_id)
+            return None
+        directory = self._session_dir(session_id)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{uuid.uuid4().hex}.feather")
+        try:
+            feather.write_feather(df, path, compression="lz4")
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.warning("Session %s: dataset version not persisted: %s", session_id, e)
+            if os.path.exists(path):
+                os.unlink(path)
+            return None
+        return path
+
+    @staticmethod
+    def read_frame(path: str) -> pd.DataFrame:
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+    def save(self, session: Dict[str, Any]):
+        state = {
+            key: value for key, value in session.items()
+            if not key.startswith("_") and key not in _FRAME_KEYS
+        }
+        for stack in ("undo_stack", "redo_stack"):
+            state[stack] = [
+                {"path": entry["path"], "timestamp": entry["timestamp"]}
+                for entry in session[stack] if entry.get("path")
+            ]
+        directory = self._session_dir(session["session_id"])
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(orjson.dumps(make_serializable(state)))
+            os.replace(tmp_path, self._meta_path(session["session_id"]))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        session["_persisted_mtime"] = self._disk_mtime(session["session_id"])
+        self._collect_versions(directory, state)
+
+    def _collect_versions(self, directory: str, state: Dict[str, Any]):
+        referenced = {state.get("dataset_path"), state.get("original_path")}
+        referenced.update(entry["path"] for entry in state["undo_stack"] + state["redo_stack"])
+        cutoff = datetime.now().timestamp() - VERSION_GC_GRACE_SECONDS
+        for entry in os.scandir(directory):
+            if entry.name.endswith(".feather") and entry.path not in referenced:
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+    def _load(self, session_id: str) -> Dict[str, Any]:
+        meta_path = self._meta_path(session_id)
+        with open(meta_path, "rb") as f:
+            session = orjson.loads(f.read())
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+        session["dataset"] = self.read_frame(session["dataset_path"]) if session.get("dataset_path") else None
+        session["original_dataset"] = self.read_frame(session["original_path"]) if session.get("original_path") else None
+        session["_stats_cache"] = {}
+        session["_persisted_mtime"] = mtime
+        return session
+
+sessions = SessionStore(SESSION_DIR, MAX_HOT_SESSIONS, SESSION_IDLE_TTL_SECONDS)
+
+@app.middleware("http")
+async def persist_sessions(request, call_next):
+    token = _request_sessions.set({})
+    try:
+        return await call_next(request)
+    finally:
+        touched = _request_sessions.get()
+        _request_sessions.reset(token)
+        if touched:
+            await run_in_threadpool(sessions.release, touched)
 
 def get_session(session_id: str) -> Dict[str, Any]:
-    if session_id not in sessions:
-        sessions[session_id] = {
+    session = sessions.get(session_id)
+    if session is None:
+        session = {
+            "session_id": session_id,
             "dataset": None,
+            "dataset_path": None,
             "original_dataset": None,
+            "original_path": None,
             "column_types": {},
             "column_analysis": {},
             "cleaning_history": {},
             "undo_stack": [],
             "redo_stack": [],
             "anomaly_results": {},
+            "ai_history": [],
+            "dataset_version": 0,
+            "_stats_cache": {},
             "created_at": datetime.now().isoformat()
         }
-    return sessions[session_id]
+        sessions.add(session)
+    sessions.acquire(session)
+    return session
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+EXPORT_CHUNK_ROWS = 50_000
+MAX_UNDO_STEPS = 20
+MAX_UNDO_BYTES = 512 * 1024**2
+
+def make_snapshot(session: Dict[str, Any], column: Optional[str] = None) -> Dict[str, Any]:
+    """Capture an undo/redo entry for the current dataset.
+
+    `path` points at the dataset's immutable version file and is all that gets
+    persisted; in memory we also keep just `column` for single-column edits, otherwise
+    a shallow CoW copy of the frame. Neither copies data: the live frame copies a
+    column only when it is next written.
+    """
+    df = session["dataset"]
+    snapshot = {"path": session.get("dataset_path"), "timestamp": datetime.now().isoformat()}
+    if column is not None and column in df.columns:
+        snapshot.update(column=column, series=df[column])
+    else:
+        snapshot["dataset"] = df.copy(deep=False)
+    return snapshot
+
+def restore_snapshot(df: pd.DataFrame, snapshot: Dict[str, Any]) -> pd.DataFrame:
+    if "column" in snapshot:
+        restored = df.copy(deep=False)
+        restored[snapshot["column"]] = snapshot["series"]
+        return restored
+    if "dataset" in snapshot:
+        return snapshot["dataset"]
+    # Entry reloaded from disk: only the version path survives.
+    return sessions.read_frame(snapshot["path"])
+
+def _column_buffer(series: pd.Series):
+    """Return (identity, nbytes) of the buffer backing a column, so CoW-shared buffers can be counted once."""
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        while isinstance(values.base, np.ndarray):
+            values = values.base
+        return id(values), values.nbytes
+    return id(series.array), series.array.nbytes
+
+def stack_nbytes(stack: List[Dict[str, Any]]) -> int:
+    buffers = {}
+    for entry in stack:
+        if "column" in entry:
+            columns = [entry["series"]]
+        elif "dataset" in entry:
+            columns = [series for _, series in entry["dataset"].items()]
+        else:
+            continue
+        for series in columns:
+            key, nbytes = _column_buffer(series)
+            buffers[key] = nbytes
+    return sum(buffers.values())
+
+def push_snapshot(stack: List[Dict[str, Any]], snapshot: Dict[str, Any]):
+    stack.append(snapshot)
+    while len(stack) > MAX_UNDO_STEPS:
+        stack.pop(0)
+    while len(stack) > 1 and stack_nbytes(stack) > MAX_UNDO_BYTES:
+        stack.pop(0)
+
+def set_dataset(session: Dict[str, Any], df: pd.DataFrame, path: Optional[str] = None):
+    """Replace the session dataset and invalidate everything derived from the previous version.
+
+    `path` reuses an existing version file (undo/redo/reset); otherwise `df` is written as a new one.
+    """
+    session["dataset"] = df
+    session["dataset_path"] = path if path is not None else sessions.write_frame(session["session_id"], df)
+    session["dataset_version"] += 1
+    session["_stats_cache"].clear()
+
+def get_cached(session: Dict[str, Any], name: str, compute):
+    key = (name, session["dataset_version"])
+    cache = session["_stats_cache"]
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+async def get_cached_async(session: Dict[str, Any], name: str, compute):
+    key = (name, session["dataset_version"])
+    cache = session["_stats_cache"]
+    if key not in cache:
+        cache[key] = await compute()
+    return cache[key]
+
+NUMERIC_COLUMN_TYPES = ["continuous", "integer", "ordinal"]
+
+def column_type_series(session: Dict[str, Any]) -> pd.Series:
+    """Detected column types as a categorical Series indexed by column name, for vectorized lookups."""
+    return pd.Series(session["column_types"], dtype="category")
 
 def detect_column_types(df: pd.DataFrame) -> Dict[str, str]:
-    column_types = {}
-    for col in df.columns:
-        series = df[col].dropna()
-        if len(series) == 0:
-            column_types[col] = 'empty'
-            continue
-        unique_vals = series.unique()
-        if len(unique_vals) == 2:
-            column_types[col] = 'binary'
-            continue
-        if series.dtype == 'object':
-            if len(unique_vals) / len(series) < 0.1 and len(unique_vals) < 20:
-                column_types[col] = 'categorical'
-            else:
-                column_types[col] = 'text'
-            continue
-        if pd.api.types.is_numeric_dtype(series):
-            if pd.api.types.is_integer_dtype(series):
-                if len(unique_vals) < 10 and series.min() >= 0:
-                    column_types[col] = 'ordinal'
-                else:
-                    column_types[col] = 'integer'
-            else:
-                column_types[col] = 'continuous'
-            continue
-        if pd.api.types.is_datetime64_any_dtype(series):
-            column_types[col] = 'datetime'
-            continue
-        column_types[col] = 'unknown'
-    return column_types
+    counts = df.count()
+    nunique = df.nunique(dropna=True)
+    column_types = pd.Series('unknown', index=df.columns, dtype=object)
+
+    column_types.loc[df.select_dtypes(include=['datetime', 'datetimetz']).columns] = 'datetime'
+    column_types.loc[df.select_dtypes(include=['number', 'bool'], exclude='timedelta').columns] = 'continuous'
+
+    integer_df = df.select_dtypes(include='integer', exclude='timedelta')
+    if len(integer_df.columns) > 0:
+        ordinal = (nunique[integer_df.columns] < 10) & (integer_df.min().astype(float) >= 0)
+        column_types.loc[integer_df.columns] = np.where(ordinal, 'ordinal', 'integer')
+
+    is_object = df.dtypes == object
+    is_categorical = is_object & (nunique / counts.where(counts > 0) < 0.1) & (nunique < 20)
+    column_types.loc[is_object] = 'text'
+    column_types.loc[is_categorical] = 'categorical'
+
+    column_types.loc[nunique == 2] = 'binary'
+    column_types.loc[counts == 0] = 'empty'
+    return column_types.to_dict()
 
 def serialize_value(val):
     if pd.isna(val):
@@ -91,54 +452,173 @@ def serialize_value(val):
         return val.isoformat()
     return val
 
+@singledispatch
 def make_serializable(obj):
-    """Recursively convert numpy/pandas types to native Python types for JSON serialization."""
-    if obj is None:
-        return None
-    if isinstance(obj, dict):
-        return {str(k): make_serializable(v) for k, v in obj.items()}
-    elif isinstance(obj, (list, tuple)):
-        return [make_serializable(v) for v in obj]
-    elif isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        val = float(obj)
-        return val if np.isfinite(val) else None
-    elif isinstance(obj, np.ndarray):
+    """Convert numpy/pandas types to native Python types for JSON serialization."""
+    try:
+        if pd.isna(obj):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return str(obj)
+
+@make_serializable.register(type(None))
+@make_serializable.register(str)
+@make_serializable.register(int)
+def _(obj):
+    return obj
+
+@make_serializable.register(float)
+@make_serializable.register(np.floating)
+def _(obj):
+    val = float(obj)
+    return val if math.isfinite(val) else None
+
+@make_serializable.register(np.integer)
+def _(obj):
+    return int(obj)
+
+@make_serializable.register(np.bool_)
+def _(obj):
+    return bool(obj)
+
+@make_serializable.register(pd.Timestamp)
+def _(obj):
+    return obj.isoformat()
+
+@make_serializable.register(dict)
+def _(obj):
+    return {str(k): make_serializable(v) for k, v in obj.items()}
+
+@make_serializable.register(list)
+@make_serializable.register(tuple)
+def _(obj):
+    return [make_serializable(v) for v in obj]
+
+@make_serializable.register(np.ndarray)
+def _(obj):
+    if obj.dtype == object:
         return [make_serializable(v) for v in obj.tolist()]
-    elif isinstance(obj, np.bool_):
-        return bool(obj)
-    elif isinstance(obj, pd.Timestamp):
-        return obj.isoformat()
-    elif pd.isna(obj):
-        return None
-    elif isinstance(obj, (str, int, float, bool)):
-        return obj
-    else:
+    if np.issubdtype(obj.dtype, np.floating):
+        # Same NaN/inf -> None rule as the scalar converter, applied in one C pass.
+        return np.where(np.isfinite(obj), obj, None).tolist()
+    return obj.tolist()
+
+def read_uploaded_file(path: str, filename: str) -> pd.DataFrame:
+    if filename.endswith('.csv'):
+        return pd.read_csv(path, engine="c", low_memory=False, memory_map=True)
+    return pd.read_excel(path, engine="calamine")
+
+def _json_ready(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Object-dtype copy with `_index` first and NaN/inf/NaT mapped to None.
+    Timestamps are left as-is for the orjson default to render with isoformat().
+    """
+    out = df.copy(deep=False)
+
+    numeric = out.select_dtypes(include='number', exclude='timedelta')
+    if len(numeric.columns) > 0:
+        out[numeric.columns] = numeric.mask(~np.isfinite(numeric.astype(float)))
+
+    out.insert(0, "_index", out.pop("_index") if "_index" in out.columns else out.index)
+    return out.astype(object).where(out.notna(), None)
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert rows to JSON-ready dicts keyed by column plus `_index`."""
+    return _json_ready(df).to_dict(orient="records")
+
+def frame_to_columns(df: pd.DataFrame) -> Dict[str, List[Any]]:
+    """Columnar counterpart of frame_to_records: one list per column, so names are not repeated per row."""
+    out = _json_ready(df)
+    return {col: values.tolist() for col, values in out.items()}
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+def frame_to_arrow_stream(df: pd.DataFrame) -> bytes:
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+def iter_csv_chunks(df: pd.DataFrame):
+    """Yield `df` as CSV text EXPORT_CHUNK_ROWS rows at a time, header first, so the full file is never held in memory."""
+    yield df.iloc[0:0].to_csv(index=False)
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        yield df.iloc[start:start + EXPORT_CHUNK_ROWS].to_csv(index=False, header=False)
+
+def write_xlsx(df: pd.DataFrame, output) -> None:
+    """Write `df` with openpyxl's write-only workbook, which streams rows instead of keeping styled cells."""
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Sheet1")
+    ws.append([str(col) for col in df.columns])
+    for start in range(0, len(df), EXPORT_CHUNK_ROWS):
+        chunk = df.iloc[start:start + EXPORT_CHUNK_ROWS]
+        # NaN/NaT/NA become empty cells, as with to_excel
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for row in chunk.itertuples(index=False, name=None):
+            ws.append(row)
+    wb.save(output)
+
+async def run_in_pool(func, *args):
+    """Run CPU-bound work in the process pool so it neither blocks the event loop nor contends for the GIL."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(app.state.pool, func, *args)
+
+def _analyze_columns(df: pd.DataFrame, columns: List[str]) -> Dict[str, Any]:
+    analyzer = ColumnAnalyzer()
+    results = {}
+    for col in columns:
         try:
-            return str(obj)
-        except:
-            return None
-
-def df_to_json(df: pd.DataFrame, max_rows: int = 1000) -> Dict[str, Any]:
-    if len(df) > max_rows:
-        sample_df = df.head(max_rows)
+            results[col] = analyzer.analyze_column(df, col)
+        except Exception as e:
+            results[col] = {"error": str(e)}
+    return make_serializable(results)
+
+def _detect_all_anomalies(df: pd.DataFrame, column_types: Dict[str, str]) -> Dict[str, Any]:
+    # Each pool worker already owns a core, so scan its batch on one thread.
+    return ANOMALY_DETECTOR.detect_all_anomalies(df, column_types, max_workers=1)
+
+def _run_hypothesis_test(df: pd.DataFrame, test_type: str, columns: List[str],
+                         parameters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    analyzer = HYPOTHESIS_ANALYZER
+    
+    if parameters and "alpha" in parameters:
+        analyzer = HypothesisAnalyzer(max_workers=1, max_cached_crosstabs=0)
+        analyzer.set_alpha(parameters["alpha"])
+    
+    test_method = getattr(analyzer, test_type)
+    if test_type in ["one_sample_ttest"]:
+        test_value = parameters.get("test_value", 0) if parameters else 0
+        return test_method(df, columns[0], test_value)
+    elif test_type in ["welch_ttest", "mann_whitney", "independent_ttest", "one_way_anova", "kruskal_wallis"]:
+        return test_method(df, columns[0], columns[1])
+    elif test_type in ["pearson_correlation", "spearman_correlation", "chi_square", "fisher_exact"]:
+        return test_method(df, columns[0], columns[1])
+    return {"error": "Test not implemented"}
+
+def _balance_data(df: pd.DataFrame, feature_cols: List[str], target_column: str,
+                  method_name: str, random_state: int) -> Dict[str, Any]:
+    return DataBalancer().balance_data(df, feature_cols, target_column, method_name, random_state=random_state)
+
+def _render_chart(chart_name: str, data, column: Optional[str] = None) -> str:
+    visualizer = DataVisualizer()
+    if chart_name == "distribution":
+        fig = visualizer.plot_column_distribution(data, column)
+    elif chart_name == "correlation":
+        fig = visualizer.plot_correlation_matrix(data)
+    elif chart_name == "missing":
+        fig = visualizer.plot_missing_patterns(data)
     else:
-        sample_df = df
-    
-    records = []
-    for idx, row in sample_df.iterrows():
-        record = {"_index": idx}
-        for col in sample_df.columns:
-            record[col] = serialize_value(row[col])
-        records.append(record)
-    
-    return {
-        "data": records,
-        "total_rows": len(df),
-        "displayed_rows": len(sample_df),
-        "columns": list(df.columns)
-    }
+        fig = visualizer.plot_column_overview(data)
+    return fig.to_json()
+
+async def chart_response(session: Dict[str, Any], name: str, chart_name: str, data, column: Optional[str] = None) -> Response:
+    """Render a chart in the pool once per dataset version and serve the cached response bytes."""
+    async def render() -> bytes:
+        chart = await run_in_pool(_render_chart, chart_name, data, column)
+        return orjson.dumps({"chart": chart})
+    return Response(await get_cached_async(session, name, render), media_type="application/json")
 
 class SessionCreate(BaseModel):
     session_id: Optional[str] = None
@@ -200,43 +680,52 @@ async def upload_file(session_id: str, file: UploadFile = File(...)):
     session = get_session(session_id)
     
     try:
-        contents = await file.read()
-        
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(io.BytesIO(contents))
-        else:
+        if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
             raise HTTPException(status_code=400, detail="Unsupported file format")
         
-        session["dataset"] = df
-        session["original_dataset"] = df.copy()
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1])
+        try:
+            with tmp:
+                while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                    tmp.write(chunk)
+            df = read_uploaded_file(tmp.name, file.filename)
+        finally:
+            os.unlink(tmp.name)
+        
+        set_dataset(session, df)
+        session["original_dataset"] = df.copy(deep=False)
+        session["original_path"] = session["dataset_path"]
         session["column_types"] = detect_column_types(df)
         session["column_analysis"] = {}
         session["cleaning_history"] = {}
         session["undo_stack"] = []
         session["redo_stack"] = []
         
+        counts = df.count()
+        missing = len(df) - counts
+        missing_pct = (missing / len(df) * 100).round(2)
+        nunique = df.nunique(dropna=True)
+        
         stats = {
             "total_rows": len(df),
             "total_columns": len(df.columns),
-            "missing_values": int(df.isnull().sum().sum()),
+            "missing_values": int(missing.sum()),
             "memory_usage_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 2)
         }
         
-        column_info = []
-        for col in df.columns:
-            col_data = {
+        column_info = [
+            {
                 "name": col,
-                "dtype": str(df[col].dtype),
+                "dtype": str(dtype),
                 "detected_type": session["column_types"].get(col, "unknown"),
-                "non_null_count": int(df[col].count()),
-                "missing_count": int(df[col].isnull().sum()),
-                "missing_percentage": round((df[col].isnull().sum() / len(df)) * 100, 2),
-                "unique_count": int(df[col].nunique()),
-                "sample_values": [serialize_value(v) for v in df[col].dropna().head(3).tolist()]
+                "non_null_count": int(counts[col]),
+                "missing_count": int(missing[col]),
+                "missing_percentage": float(missing_pct[col]),
+                "unique_count": int(nunique[col]),
+                "sample_values": [serialize_value(v) for v in df[col].dropna().iloc[:3].tolist()]
             }
-            column_info.append(col_data)
+            for col, dtype in df.dtypes.items()
+        ]
         
         return {
             "success": True,
@@ -250,7 +739,8 @@ async def upload_file(session_id: str, file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/data/{session_id}")
-def get_data(session_id: str, offset: int = 0, limit: int = 100):
+def get_data(session_id: str, offset: int = 0, limit: int = 100, orient: str = "records",
+             accept: Optional[str] = Header(None)):
     session = get_session(session_id)
     
     if session["dataset"] is None:
@@ -259,12 +749,89 @@ def get_data(session_id: str, offset: int = 0, limit: int = 100):
     df = session["dataset"]
     subset = df.iloc[offset:offset + limit]
     
-    return {
-        "data": df_to_json(subset, max_rows=limit),
+    if accept and ARROW_STREAM_MEDIA_TYPE in accept:
+        try:
+            content = frame_to_arrow_stream(subset)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            raise HTTPException(status_code=406, detail=f"Dataset cannot be encoded as Arrow: {e}")
+        return Response(content, media_type=ARROW_STREAM_MEDIA_TYPE, headers={"X-Total-Rows": str(len(df))})
+    
+    if orient not in ("records", "columns"):
+        raise HTTPException(status_code=400, detail="orient must be 'records' or 'columns'")
+    
+    return ORJSONResponse({
+        "data": {
+            "data": frame_to_records(subset) if orient == "records" else frame_to_columns(subset),
+            "total_rows": len(subset),
+            "displayed_rows": len(subset),
+            "columns": list(df.columns)
+        },
         "total_rows": len(df),
         "offset": offset,
         "limit": limit
+    })
+
+def missing_by_column(df: pd.DataFrame) -> pd.Series:
+    """Missing cells per column in one pass per dtype group, without a full boolean frame."""
+    kinds = np.array([dtype.kind if isinstance(dtype, np.dtype) else "O" for dtype in df.dtypes])
+    counts = np.zeros(len(kinds), dtype=np.int64)
+    # numpy int/uint/bool columns cannot hold missing values; numpy floats only hold NaN.
+    floats = kinds == "f"
+    other = ~np.isin(kinds, ["f", "i", "u", "b"])
+    if floats.any():
+        counts[floats] = np.isnan(df.iloc[:, floats].to_numpy()).sum(axis=0)
+    if other.any():
+        counts[other] = df.iloc[:, other].isna().to_numpy().sum(axis=0)
+    return pd.Series(counts, index=df.columns)
+
+def count_missing(df: pd.DataFrame) -> int:
+    """Total missing cells."""
+    return int(missing_by_column(df).sum())
+
+def session_missing_by_column(session: Dict[str, Any]) -> pd.Series:
+    """missing_by_column for the session dataset, computed once per dataset version."""
+    return get_cached(session, "missing_by_column", lambda: missing_by_column(session["dataset"]))
+
+def duplicated_rows(session: Dict[str, Any]) -> pd.Series:
+    """Full-row duplicate mask (keep='first'), computed once per dataset version."""
+    return get_cached(session, "duplicated", session["dataset"].duplicated)
+
+def compute_data_stats(df: pd.DataFrame, duplicated: pd.Series):
+    stats = {
+        "total_rows": len(df),
+        "total_columns": len(df.columns),
+        "missing_values": count_missing(df),
+        "memory_usage_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 2),
+        "duplicate_rows": int(duplicated.sum())
+    }
+    
+    counts = df.count()
+    nunique = df.nunique()
+    column_stats = {
+        col: {
+            "dtype": str(dtype),
+            "count": int(counts[col]),
+            "missing": int(len(df) - counts[col]),
+            "unique": int(nunique[col])
+        }
+        for col, dtype in df.dtypes.items()
     }
+    
+    numeric = df.select_dtypes(include=['number', 'bool'], exclude='timedelta')
+    if len(numeric.columns) > 0:
+        desc = numeric.astype(float).describe(percentiles=[0.25, 0.5, 0.75]).T
+        for col, row in desc[desc["count"] > 0].to_dict(orient="index").items():
+            column_stats[col].update({
+                "mean": row["mean"],
+                "median": row["50%"],
+                "std": row["std"],
+                "min": row["min"],
+                "max": row["max"],
+                "q25": row["25%"],
+                "q75": row["75%"]
+            })
+    
+    return stats, column_stats
 
 @app.get("/api/data/{session_id}/stats")
 def get_data_stats(session_id: str):
@@ -274,38 +841,9 @@ def get_data_stats(session_id: str):
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    
-    stats = {
-        "total_rows": len(df),
-        "total_columns": len(df.columns),
-        "missing_values": int(df.isnull().sum().sum()),
-        "memory_usage_mb": round(df.memory_usage(deep=True).sum() / 1024**2, 2),
-        "duplicate_rows": int(df.duplicated().sum())
-    }
-    
-    column_stats = {}
-    for col in df.columns:
-        col_stats = {
-            "dtype": str(df[col].dtype),
-            "count": int(df[col].count()),
-            "missing": int(df[col].isnull().sum()),
-            "unique": int(df[col].nunique())
-        }
-        
-        if pd.api.types.is_numeric_dtype(df[col]):
-            series = df[col].dropna()
-            if len(series) > 0:
-                col_stats.update({
-                    "mean": float(series.mean()),
-                    "median": float(series.median()),
-                    "std": float(series.std()),
-                    "min": float(series.min()),
-                    "max": float(series.max()),
-                    "q25": float(series.quantile(0.25)),
-                    "q75": float(series.quantile(0.75))
-                })
-        
-        column_stats[col] = col_stats
+    stats, column_stats = get_cached(
+        session, "data_stats", lambda: compute_data_stats(df, duplicated_rows(session))
+    )
     
     return {
         "stats": stats,
@@ -339,88 +877,54 @@ def analyze_column(session_id: str, column: str, force_refresh: bool = False):
     analyzer = ColumnAnalyzer()
     analysis = analyzer.analyze_column(df, column, force_refresh)
     
-    def make_serializable(obj):
-        if isinstance(obj, dict):
-            return {k: make_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [make_serializable(v) for v in obj]
-        elif isinstance(obj, (np.integer, np.floating)):
-            return float(obj) if np.isfinite(obj) else None
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif pd.isna(obj):
-            return None
-        return obj
-    
-    analysis = make_serializable(analysis)
     session["column_analysis"][column] = analysis
     
-    return {"column": column, "analysis": analysis}
+    return ORJSONResponse({"column": column, "analysis": analysis})
 
 @app.post("/api/analyze/all/{session_id}")
-def analyze_all_columns(session_id: str):
+async def analyze_all_columns(session_id: str):
     session = get_session(session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    analyzer = ColumnAnalyzer()
-    
-    results = {}
-    for col in df.columns:
-        try:
-            analysis = analyzer.analyze_column(df, col)
-            
-            def make_serializable(obj):
-                if isinstance(obj, dict):
-                    return {k: make_serializable(v) for k, v in obj.items()}
-                elif isinstance(obj, list):
-                    return [make_serializable(v) for v in obj]
-                elif isinstance(obj, (np.integer, np.floating)):
-                    return float(obj) if np.isfinite(obj) else None
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                elif pd.isna(obj):
-                    return None
-                return obj
-            
-            results[col] = make_serializable(analysis)
-        except Exception as e:
-            results[col] = {"error": str(e)}
+    # Columns are independent, so fan them out across the pool; interleaving spreads wide/slow columns.
+    columns = list(df.columns)
+    batches = [columns[i::POOL_WORKERS] for i in range(min(POOL_WORKERS, len(columns)))]
+    partials = await asyncio.gather(*(run_in_pool(_analyze_columns, df, batch) for batch in batches))
+    merged = {}
+    for partial in partials:
+        merged.update(partial)
+    results = {col: merged[col] for col in columns}
     
     session["column_analysis"] = results
-    return {"analyses": results}
+    return ORJSONResponse({"analyses": results})
 
 @app.post("/api/anomaly/detect/{session_id}")
-def detect_anomalies(session_id: str):
+async def detect_anomalies(session_id: str):
     session = get_session(session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    detector = AnomalyDetector()
-    
-    all_anomalies = detector.detect_all_anomalies(df, session["column_types"])
-    
-    def make_serializable(obj):
-        if isinstance(obj, dict):
-            return {k: make_serializable(v) for k, v in obj.items()}
-        elif isinstance(obj, list):
-            return [make_serializable(v) for v in obj]
-        elif isinstance(obj, (np.integer, np.floating)):
-            return float(obj) if np.isfinite(obj) else None
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif pd.isna(obj):
-            return None
-        return obj
+    # Same fan-out as analyze_all, but each worker only receives the columns it scans.
+    column_types = {col: t for col, t in session["column_types"].items() if col in df.columns}
+    columns = list(column_types)
+    batches = [columns[i::POOL_WORKERS] for i in range(min(POOL_WORKERS, len(columns)))]
+    partials = await asyncio.gather(*(
+        run_in_pool(_detect_all_anomalies, df[batch], {col: column_types[col] for col in batch})
+        for batch in batches
+    ))
+    merged = {}
+    for partial in partials:
+        merged.update(partial)
+    all_anomalies = {col: merged[col] for col in columns if col in merged}
     
-    all_anomalies = make_serializable(all_anomalies)
     session["anomaly_results"] = all_anomalies
     
-    return {"anomalies": all_anomalies}
+    return ORJSONResponse({"anomalies": all_anomalies})
 
 @app.post("/api/anomaly/fix")
 def fix_anomaly(request: AnomalyFixRequest):
@@ -429,15 +933,10 @@ def fix_anomaly(request: AnomalyFixRequest):
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
-    df = session["dataset"].copy()
-    detector = AnomalyDetector()
+    df = session["dataset"].copy(deep=False)
+    detector = ANOMALY_DETECTOR
     
-    session["undo_stack"].append({
-        "dataset": session["dataset"].copy(),
-        "timestamp": datetime.now().isoformat()
-    })
-    if len(session["undo_stack"]) > 20:
-        session["undo_stack"].pop(0)
+    push_snapshot(session["undo_stack"], make_snapshot(session, request.column))
     session["redo_stack"].clear()
     
     if request.action == "remove":
@@ -451,7 +950,7 @@ def fix_anomaly(request: AnomalyFixRequest):
     else:
         raise HTTPException(status_code=400, detail="Invalid action")
     
-    session["dataset"] = df
+    set_dataset(session, df)
     
     return {"success": True, "summary": summary}
 
@@ -462,15 +961,10 @@ def apply_cleaning(request: CleaningRequest):
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
-    df = session["dataset"].copy()
-    engine = DataCleaningEngine()
+    df = session["dataset"].copy(deep=False)
+    engine = CLEANING_ENGINE
     
-    session["undo_stack"].append({
-        "dataset": session["dataset"].copy(),
-        "timestamp": datetime.now().isoformat()
-    })
-    if len(session["undo_stack"]) > 20:
-        session["undo_stack"].pop(0)
+    push_snapshot(session["undo_stack"], make_snapshot(session, request.column))
     session["redo_stack"].clear()
     
     try:
@@ -479,7 +973,7 @@ def apply_cleaning(request: CleaningRequest):
         )
         
         df[request.column] = cleaned_series
-        session["dataset"] = df
+        set_dataset(session, df)
         
         if request.column not in session["cleaning_history"]:
             session["cleaning_history"][request.column] = []
@@ -492,20 +986,7 @@ def apply_cleaning(request: CleaningRequest):
             "timestamp": datetime.now().isoformat()
         })
         
-        def make_serializable(obj):
-            if isinstance(obj, dict):
-                return {k: make_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [make_serializable(v) for v in obj]
-            elif isinstance(obj, (np.integer, np.floating)):
-                return float(obj) if np.isfinite(obj) else None
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif pd.isna(obj):
-                return None
-            return obj
-        
-        return {"success": True, "metadata": make_serializable(metadata)}
+        return ORJSONResponse({"success": True, "metadata": metadata})
     
     except Exception as e:
         session["undo_stack"].pop()
@@ -548,13 +1029,9 @@ def undo_operation(session_id: str):
     if not session["undo_stack"]:
         raise HTTPException(status_code=400, detail="Nothing to undo")
     
-    session["redo_stack"].append({
-        "dataset": session["dataset"].copy(),
-        "timestamp": datetime.now().isoformat()
-    })
-    
     previous_state = session["undo_stack"].pop()
-    session["dataset"] = previous_state["dataset"]
+    push_snapshot(session["redo_stack"], make_snapshot(session, previous_state.get("column")))
+    set_dataset(session, restore_snapshot(session["dataset"], previous_state), previous_state.get("path"))
     
     return {"success": True, "message": "Undo successful"}
 
@@ -565,13 +1042,9 @@ def redo_operation(session_id: str):
     if not session["redo_stack"]:
         raise HTTPException(status_code=400, detail="Nothing to redo")
     
-    session["undo_stack"].append({
-        "dataset": session["dataset"].copy(),
-        "timestamp": datetime.now().isoformat()
-    })
-    
     next_state = session["redo_stack"].pop()
-    session["dataset"] = next_state["dataset"]
+    push_snapshot(session["undo_stack"], make_snapshot(session, next_state.get("column")))
+    set_dataset(session, restore_snapshot(session["dataset"], next_state), next_state.get("path"))
     
     return {"success": True, "message": "Redo successful"}
 
@@ -592,64 +1065,35 @@ def recommend_hypothesis_test(session_id: str, columns: List[str]):
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    analyzer = HypothesisAnalyzer()
+    analyzer = HYPOTHESIS_ANALYZER
     
-    data_types = {}
-    for col in columns:
-        col_type = session["column_types"].get(col, "unknown")
-        if col_type in ["continuous", "integer", "ordinal"]:
-            data_types[col] = "numeric"
-        else:
-            data_types[col] = "categorical"
+    is_numeric = column_type_series(session).reindex(columns).isin(NUMERIC_COLUMN_TYPES)
+    data_types = dict(zip(columns, np.where(is_numeric, "numeric", "categorical").tolist()))
     
     recommendations = analyzer.recommend_test(df, columns, data_types)
     return recommendations
 
 @app.post("/api/hypothesis/test")
-def run_hypothesis_test(request: HypothesisTestRequest):
+async def run_hypothesis_test(request: HypothesisTestRequest):
     session = get_session(request.session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    analyzer = HypothesisAnalyzer()
-    
-    if request.parameters and "alpha" in request.parameters:
-        analyzer.set_alpha(request.parameters["alpha"])
     
-    test_method = getattr(analyzer, request.test_type, None)
-    if test_method is None:
+    if getattr(HypothesisAnalyzer, request.test_type, None) is None:
         raise HTTPException(status_code=400, detail=f"Unknown test type: {request.test_type}")
     
+    missing = [col for col in dict.fromkeys(request.columns) if col not in df.columns]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Unknown column(s): {', '.join(map(str, missing))}")
+    
     try:
-        if request.test_type in ["one_sample_ttest"]:
-            test_value = request.parameters.get("test_value", 0) if request.parameters else 0
-            result = test_method(df, request.columns[0], test_value)
-        elif request.test_type in ["welch_ttest", "mann_whitney", "independent_ttest", "one_way_anova", "kruskal_wallis"]:
-            result = test_method(df, request.columns[0], request.columns[1])
-        elif request.test_type in ["pearson_correlation", "spearman_correlation", "chi_square", "fisher_exact"]:
-            result = test_method(df, request.columns[0], request.columns[1])
-        else:
-            result = {"error": "Test not implemented"}
-        
-        def make_serializable(obj):
-            if isinstance(obj, dict):
-                return {k: make_serializable(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [make_serializable(v) for v in obj]
-            elif isinstance(obj, tuple):
-                return [make_serializable(v) for v in obj]
-            elif isinstance(obj, (np.integer, np.floating)):
-                val = float(obj)
-                return val if np.isfinite(val) else None
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            elif pd.isna(obj):
-                return None
-            return obj
-        
-        return make_serializable(result)
+        result = await run_in_pool(
+            _run_hypothesis_test, df[list(dict.fromkeys(request.columns))], request.test_type, request.columns, request.parameters
+        )
+        return ORJSONResponse(result)
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -747,7 +1191,7 @@ def get_balancing_methods():
     return {"methods": result}
 
 @app.post("/api/balance")
-def apply_balance(request: BalancerRequest):
+async def apply_balance(request: BalancerRequest):
     session = get_session(request.session_id)
     
     if session["dataset"] is None:
@@ -769,9 +1213,9 @@ def apply_balance(request: BalancerRequest):
         raise HTTPException(status_code=400, detail="; ".join(validation['errors']))
     
     try:
-        result = balancer.balance_data(
-            df, feature_cols, request.target_column, method_name,
-            random_state=request.parameters.get('random_state', 42) if request.parameters else 42
+        result = await run_in_pool(
+            _balance_data, df[feature_cols + [request.target_column]], feature_cols, request.target_column, method_name,
+            request.parameters.get('random_state', 42) if request.parameters else 42
         )
         
         if not result['success']:
@@ -779,14 +1223,10 @@ def apply_balance(request: BalancerRequest):
         
         balanced_df = result['balanced_data']
         
-        session["undo_stack"].append({
-            "dataset": session["dataset"].copy(),
-            "timestamp": datetime.now().isoformat()
-        })
-        if len(session["undo_stack"]) > 20:
-            session["undo_stack"].pop(0)
-        session["redo_stack"].clear()
-        session["dataset"] = balanced_df
+        if not result.get('skipped'):
+            push_snapshot(session["undo_stack"], make_snapshot(session))
+            session["redo_stack"].clear()
+            set_dataset(session, balanced_df)
         
         original_dist = result.get('original_distribution', pd.Series())
         balanced_dist = result.get('balanced_distribution', pd.Series())
@@ -797,7 +1237,8 @@ def apply_balance(request: BalancerRequest):
             "new_samples": result.get('balanced_size', len(balanced_df)),
             "original_distribution": {str(k): int(v) for k, v in original_dist.items()} if hasattr(original_dist, 'items') else {},
             "class_distribution": {str(k): int(v) for k, v in balanced_dist.items()} if hasattr(balanced_dist, 'items') else {},
-            "feature_columns_used": len(feature_cols)
+            "feature_columns_used": len(feature_cols),
+            "skipped": result.get('skipped', False)
         }
         
         return {"success": True, "summary": make_serializable(summary)}
@@ -808,56 +1249,48 @@ def apply_balance(request: BalancerRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/api/visualization/{session_id}/distribution/{column}")
-def get_distribution_chart(session_id: str, column: str):
+async def get_distribution_chart(session_id: str, column: str):
     session = get_session(session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    visualizer = DataVisualizer()
     
-    fig = visualizer.plot_column_distribution(df[column], column)
-    return {"chart": fig.to_json()}
+    return await chart_response(session, f"chart:distribution:{column}", "distribution", df[column], column)
 
 @app.get("/api/visualization/{session_id}/correlation")
-def get_correlation_chart(session_id: str):
+async def get_correlation_chart(session_id: str):
     session = get_session(session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    visualizer = DataVisualizer()
     
-    fig = visualizer.plot_correlation_matrix(df)
-    return {"chart": fig.to_json()}
+    return await chart_response(session, "chart:correlation", "correlation", df)
 
 @app.get("/api/visualization/{session_id}/missing")
-def get_missing_chart(session_id: str):
+async def get_missing_chart(session_id: str):
     session = get_session(session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    visualizer = DataVisualizer()
     
-    fig = visualizer.plot_missing_patterns(df)
-    return {"chart": fig.to_json()}
+    return await chart_response(session, "chart:missing", "missing", df)
 
 @app.get("/api/visualization/{session_id}/overview")
-def get_overview_chart(session_id: str):
+async def get_overview_chart(session_id: str):
     session = get_session(session_id)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
     df = session["dataset"]
-    visualizer = DataVisualizer()
     
-    fig = visualizer.plot_column_overview(df)
-    return {"chart": fig.to_json()}
+    return await chart_response(session, "chart:overview", "overview", df)
 
 @app.post("/api/export/config/{session_id}")
 def export_config(session_id: str):
@@ -892,17 +1325,14 @@ def export_data(session_id: str, format: str = "csv"):
     df = session["dataset"]
     
     if format == "csv":
-        output = io.StringIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
         return StreamingResponse(
-            iter([output.getvalue()]),
+            iter_csv_chunks(df),
             media_type="text/csv",
             headers={"Content-Disposition": f"attachment; filename=cleaned_data.csv"}
         )
     elif format == "xlsx":
         output = io.BytesIO()
-        df.to_excel(output, index=False)
+        write_xlsx(df, output)
         output.seek(0)
         return StreamingResponse(
             output,
@@ -919,12 +1349,9 @@ def reset_to_original(session_id: str):
     if session["original_dataset"] is None:
         raise HTTPException(status_code=404, detail="No original dataset")
     
-    session["undo_stack"].append({
-        "dataset": session["dataset"].copy(),
-        "timestamp": datetime.now().isoformat()
-    })
+    push_snapshot(session["undo_stack"], make_snapshot(session))
     
-    session["dataset"] = session["original_dataset"].copy()
+    set_dataset(session, session["original_dataset"].copy(deep=False), session["original_path"])
     session["cleaning_history"] = {}
     
     return {"success": True, "message": "Reset to original dataset"}
@@ -938,42 +1365,59 @@ class AIRecommendationRequest(BaseModel):
     session_id: str
     column: str
 
-ai_assistants: Dict[str, Any] = {}
+# Assistants only hold a Groq client and per-request context; the conversation itself lives in
+# session["ai_history"], so it is persisted with the session and evicting an assistant loses nothing.
+ai_assistants: "OrderedDict[str, Any]" = OrderedDict()
+_ai_assistants_lock = threading.Lock()
+
+def get_ai_assistant(session: Dict[str, Any]):
+    from modules.ai_assistant import AIAssistant
+    session_id = session["session_id"]
+    with _ai_assistants_lock:
+        assistant = ai_assistants.get(session_id)
+        if assistant is None:
+            assistant = ai_assistants[session_id] = AIAssistant()
+            while len(ai_assistants) > MAX_AI_ASSISTANTS:
+                ai_assistants.popitem(last=False)
+        ai_assistants.move_to_end(session_id)
+    # Sessions reloaded from disk come back as new objects, so rebind every time.
+    assistant.conversation_history = session.setdefault("ai_history", [])
+    return assistant
+
+def ai_dataset_info(session: Dict[str, Any]) -> Dict[str, Any]:
+    df = session["dataset"]
+    return {
+        'shape': f"{len(df)} rows x {len(df.columns)} columns",
+        'columns': len(df.columns),
+        'column_types': session["column_types"],
+        'missing_summary': session_missing_by_column(session).to_dict()
+    }
 
-def get_ai_assistant(session_id: str):
-    if session_id not in ai_assistants:
-        from modules.ai_assistant import AIAssistant
-        ai_assistants[session_id] = AIAssistant()
-    return ai_assistants[session_id]
+def _ask_ai_context(session: Dict[str, Any], assistant) -> Dict[str, Any]:
+    df = session["dataset"]
+    current_state = {
+        'current_dataset_stats': {
+            'rows': len(df),
+            'columns': len(df.columns),
+            'missing_total': int(session_missing_by_column(session).sum()),
+            'columns_cleaned': len(session["cleaning_history"])
+        },
+        'cleaning_history': make_serializable(session["cleaning_history"])
+    }
+    assistant.set_context(ai_dataset_info(session))
+    return current_state
 
 @app.post("/api/ai/ask")
-def ask_ai(request: AIQuestionRequest):
+async def ask_ai(request: AIQuestionRequest):
     session = get_session(request.session_id)
-    assistant = get_ai_assistant(request.session_id)
+    assistant = get_ai_assistant(session)
     
     current_state = {}
     if session["dataset"] is not None:
-        df = session["dataset"]
-        current_state = {
-            'current_dataset_stats': {
-                'rows': len(df),
-                'columns': len(df.columns),
-                'missing_total': int(df.isnull().sum().sum()),
-                'columns_cleaned': len(session["cleaning_history"])
-            },
-            'cleaning_history': make_serializable(session["cleaning_history"])
-        }
-        
-        dataset_info = {
-            'shape': f"{len(df)} rows x {len(df.columns)} columns",
-            'columns': len(df.columns),
-            'column_types': session["column_types"],
-            'missing_summary': {col: int(df[col].isnull().sum()) for col in df.columns}
-        }
-        assistant.set_context(dataset_info)
+        current_state = await run_in_threadpool(_ask_ai_context, session, assistant)
     
     try:
-        response = assistant.ask_question(
+        response = await assistant.ask_question_async(
             request.question,
             column_specific=request.column,
             current_data_state=current_state
@@ -982,46 +1426,40 @@ def ask_ai(request: AIQuestionRequest):
     except Exception as e:
         return {"response": f"I apologize, but I couldn't process your question. Error: {str(e)}", "success": False}
 
+def _recommendation_question(session: Dict[str, Any], assistant, column: str) -> str:
+    assistant.set_context(ai_dataset_info(session))
+    analysis = session["column_analysis"].get(column, {})
+    if analysis:
+        return assistant.build_intelligent_cleaning_question(column, analysis, session["dataset"])
+    return assistant.build_cleaning_question(column, {})
+
 @app.post("/api/ai/recommend/{session_id}/{column}")
-def get_ai_recommendation(session_id: str, column: str):
+async def get_ai_recommendation(session_id: str, column: str):
     session = get_session(session_id)
-    assistant = get_ai_assistant(session_id)
+    assistant = get_ai_assistant(session)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
-    df = session["dataset"]
-    
-    if column not in df.columns:
+    if column not in session["dataset"].columns:
         raise HTTPException(status_code=404, detail=f"Column {column} not found")
     
-    dataset_info = {
-        'shape': f"{len(df)} rows x {len(df.columns)} columns",
-        'columns': len(df.columns),
-        'column_types': session["column_types"],
-        'missing_summary': {col: int(df[col].isnull().sum()) for col in df.columns}
-    }
-    assistant.set_context(dataset_info)
-    
-    analysis = session["column_analysis"].get(column, {})
-    
     try:
-        if analysis:
-            recommendation = assistant.get_intelligent_cleaning_recommendation(column, analysis, df)
-        else:
-            recommendation = assistant.get_cleaning_recommendation(column, {})
+        # Issue detection is pandas work; only the model call itself stays on the loop.
+        question = await run_in_threadpool(_recommendation_question, session, assistant, column)
+        recommendation = await assistant.ask_question_async(question, column)
         return {"recommendation": recommendation, "column": column, "success": True}
     except Exception as e:
         return {"recommendation": f"Unable to generate recommendation: {str(e)}", "success": False}
 
 @app.get("/api/ai/history/{session_id}")
 def get_ai_history(session_id: str):
-    assistant = get_ai_assistant(session_id)
+    assistant = get_ai_assistant(get_session(session_id))
     return {"history": assistant.get_conversation_history()}
 
 @app.post("/api/ai/clear/{session_id}")
 def clear_ai_history(session_id: str):
-    assistant = get_ai_assistant(session_id)
+    assistant = get_ai_assistant(get_session(session_id))
     assistant.clear_conversation_history()
     return {"success": True}
 
@@ -1037,7 +1475,7 @@ def detect_column_anomalies(session_id: str, column: str):
     if column not in df.columns:
         raise HTTPException(status_code=404, detail=f"Column {column} not found")
     
-    detector = AnomalyDetector()
+    detector = ANOMALY_DETECTOR
     column_type = session["column_types"].get(column, "unknown")
     
     anomalies = detector.detect_column_anomalies(df, column, column_type)
@@ -1063,15 +1501,15 @@ def detect_duplicates(request: DuplicateDetectRequest):
     df = session["dataset"]
     
     subset = request.columns if request.columns and len(request.columns) > 0 else None
-    duplicates = df.duplicated(subset=subset, keep='first')
+    duplicates = duplicated_rows(session) if subset is None else df.duplicated(subset=subset, keep='first')
     duplicate_count = int(duplicates.sum())
     
     sample_duplicates = []
     if duplicate_count > 0:
-        dup_indices = df[duplicates].head(100).index.tolist()
-        for idx in dup_indices:
-            row = {str(col): serialize_value(df.loc[idx, col]) for col in df.columns}
-            sample_duplicates.append(row)
+        sample = df[duplicates].head(100)
+        columns = [str(col) for col in sample.columns]
+        for values in sample.itertuples(index=False, name=None):
+            sample_duplicates.append({col: serialize_value(v) for col, v in zip(columns, values)})
     
     return {
         "duplicate_count": duplicate_count,
@@ -1087,12 +1525,7 @@ def remove_duplicates(request: DuplicateRemoveRequest):
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
-    session["undo_stack"].append({
-        "dataset": session["dataset"].copy(),
-        "timestamp": datetime.now().isoformat()
-    })
-    if len(session["undo_stack"]) > 20:
-        session["undo_stack"].pop(0)
+    push_snapshot(session["undo_stack"], make_snapshot(session))
     session["redo_stack"].clear()
     
     df = session["dataset"]
@@ -1104,7 +1537,7 @@ def remove_duplicates(request: DuplicateRemoveRequest):
         keep = False
     
     df_clean = df.drop_duplicates(subset=subset, keep=keep)
-    session["dataset"] = df_clean
+    set_dataset(session, df_clean)
     
     removed = original_count - len(df_clean)
     
@@ -1238,33 +1671,32 @@ def preview_cleaning(request: CleanPreviewRequest):
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
     
-    df = session["dataset"].copy()
-    engine = DataCleaningEngine()
+    df = session["dataset"].copy(deep=False)
+    engine = CLEANING_ENGINE
     
     try:
-        original_series = df[request.column].copy()
+        original_series = df[request.column]
         cleaned_series, metadata = engine.apply_cleaning_method(
             df, request.column, request.method_type, request.method_name, request.parameters
         )
         
-        changes = []
-        for idx in range(min(len(original_series), 100)):
-            if pd.isna(original_series.iloc[idx]) and not pd.isna(cleaned_series.iloc[idx]):
-                changes.append({
-                    "index": idx,
-                    "before": None,
-                    "after": serialize_value(cleaned_series.iloc[idx])
-                })
-            elif not pd.isna(original_series.iloc[idx]) and original_series.iloc[idx] != cleaned_series.iloc[idx]:
-                changes.append({
-                    "index": idx,
-                    "before": serialize_value(original_series.iloc[idx]),
-                    "after": serialize_value(cleaned_series.iloc[idx])
-                })
+        before_na = original_series.isna().to_numpy()
+        after_na = cleaned_series.isna().to_numpy()
+        both = ~(before_na | after_na)
+        differs = np.zeros(len(original_series), dtype=bool)
+        differs[both] = (original_series.to_numpy(dtype=object)[both]
+                         != cleaned_series.to_numpy(dtype=object)[both])
+        changed = (before_na != after_na) | differs
+        rows_affected = int(changed.sum())
         
-        rows_affected = sum(1 for i in range(len(original_series)) 
-                          if (pd.isna(original_series.iloc[i]) != pd.isna(cleaned_series.iloc[i])) or 
-                          (not pd.isna(original_series.iloc[i]) and original_series.iloc[i] != cleaned_series.iloc[i]))
+        changes = [
+            {
+                "index": int(idx),
+                "before": serialize_value(original_series.iloc[idx]),
+                "after": serialize_value(cleaned_series.iloc[idx])
+            }
+            for idx in np.flatnonzero(changed[:100])
+        ]
         
         return {
             "rows_affected": rows_affected,
@@ -1348,9 +1780,9 @@ class AITestRecommendRequest(BaseModel):
     question: str
 
 @app.post("/api/hypothesis/ai-recommend")
-def get_ai_test_recommendation(request: AITestRecommendRequest):
+async def get_ai_test_recommendation(request: AITestRecommendRequest):
     session = get_session(request.session_id)
-    assistant = get_ai_assistant(request.session_id)
+    assistant = get_ai_assistant(session)
     
     if session["dataset"] is None:
         raise HTTPException(status_code=404, detail="No dataset loaded")
@@ -1365,11 +1797,12 @@ def get_ai_test_recommendation(request: AITestRecommendRequest):
     }
     assistant.set_context(dataset_info)
     
-    numeric_cols = [col for col, t in session["column_types"].items() if t in ['continuous', 'integer', 'ordinal']]
-    categorical_cols = [col for col, t in session["column_types"].items() if t in ['categorical', 'binary']]
+    column_types = column_type_series(session)
+    numeric_cols = column_types.index[column_types.isin(NUMERIC_COLUMN_TYPES)].tolist()
+    categorical_cols = column_types.index[column_types.isin(['categorical', 'binary'])].tolist()
     
     try:
-        response = assistant.ask_question(
+        response = await assistant.ask_question_async(
             f"Based on the research question: '{request.question}', recommend the most appropriate statistical test. "
             f"Available numeric columns: {numeric_cols}. Available categorical columns: {categorical_cols}. "
             f"Provide: 1) Primary test recommendation with rationale, 2) Alternative tests, 3) Which columns to use."
@@ -1445,7 +1878,7 @@ def generate_report_preview(request: ReportRequest):
         "dataset_name": "Uploaded Dataset",
         "rows": len(df),
         "columns": len(df.columns),
-        "missing_values": int(df.isnull().sum().sum()),
+        "missing_values": count_missing(df),
         "memory_usage": round(df.memory_usage(deep=True).sum() / 1024**2, 2),
         "generated_at": datetime.now().isoformat()
     }
@@ -1470,7 +1903,7 @@ def generate_report_preview(request: ReportRequest):
         "statistics": {
             "numeric_columns": len(df.select_dtypes(include=[np.number]).columns),
             "categorical_columns": len(df.select_dtypes(exclude=[np.number]).columns),
-            "columns_with_missing": len([c for c in df.columns if df[c].isnull().any()])
+            "columns_with_missing": int((session_missing_by_column(session) > 0).sum())
         }
     }
 
@@ -1491,7 +1924,7 @@ def generate_report(request: ReportRequest):
                 "dataset_name": "Uploaded Dataset",
                 "rows": len(df),
                 "columns": len(df.columns),
-                "missing_values": int(df.isnull().sum().sum()),
+                "missing_values": count_missing(df),
                 "generated_at": datetime.now().isoformat()
             },
             "column_analysis": make_serializable(session["column_analysis"]),
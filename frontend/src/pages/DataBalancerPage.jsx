@@ -145,7 +145,11 @@ export default function DataBalancerPage() {
       });
       setResult(balanceResult);
       await fetchStats();
-      toast.success('Dataset balanced successfully');
+      if (balanceResult.summary?.skipped) {
+        toast.success('Classes are already balanced; dataset left unchanged');
+      } else {
+        toast.success('Dataset balanced successfully');
+      }
     } catch (error) {
       toast.error(error.message || 'Balancing failed');
     } finally {
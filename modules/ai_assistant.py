@@ -1,10 +1,11 @@
 import streamlit as st
 import os
-from groq import Groq
+from groq import Groq, AsyncGroq
 from typing import Dict, List, Any, Optional
 import json
 import pandas as pd
 from datetime import datetime
+from modules.response_cache import RESPONSE_CACHE, normalize_question
 
 class AIAssistant:
     """AI-powered conversational assistant for data cleaning guidance"""
@@ -22,6 +23,7 @@ class AIAssistant:
             self.groq_api_key = os.getenv("GROQ_API_KEY")
 
         self.client = None
+        self.async_client = None
         self.model = "llama-3.1-8b-instant"
         self.conversation_history = []
         self.context = {}
@@ -60,39 +62,79 @@ class AIAssistant:
 
         
         try:
-            # Update context with current data state if provided
-            if current_data_state:
-                self._update_context_with_current_state(current_data_state)
+            request, cache_key = self._prepare_request(question, column_specific, current_data_state)
+            ai_response = RESPONSE_CACHE.get(cache_key)
+            if ai_response is None:
+                response = self.client.chat.completions.create(**request)
+                ai_response = response.choices[0].message.content or "No response received"
+                RESPONSE_CACHE.put(cache_key, ai_response)
             
-            # Build context-aware prompt
-            system_prompt = self._build_system_prompt(column_specific)
-            user_message = self._build_user_message(question, column_specific)
+            return self._record_answer(question, column_specific, ai_response)
             
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.1,
-                max_tokens=1500
-            )
-            
-            ai_response = response.choices[0].message.content or "No response received"
-            
-            # Store conversation
-            self.conversation_history.append({
-                'timestamp': datetime.now().isoformat(),
-                'question': question,
-                'column': column_specific,
-                'response': ai_response
-            })
+        except Exception as e:
+            return f"Error getting AI response: {str(e)}"
+    
+    async def ask_question_async(self, question: str, column_specific: Optional[str] = None,
+                                 current_data_state: Optional[Dict[str, Any]] = None) -> str:
+        """Same as ask_question, but awaits the Groq call instead of blocking a thread"""
+        if self.async_client is None:
+            try:
+                self.async_client = AsyncGroq(api_key=self.groq_api_key)
+            except Exception as e:
+                return f"AI initialization failed: {str(e)}"
+        
+        try:
+            request, cache_key = self._prepare_request(question, column_specific, current_data_state)
+            ai_response = RESPONSE_CACHE.get(cache_key)
+            if ai_response is None:
+                response = await self.async_client.chat.completions.create(**request)
+                ai_response = response.choices[0].message.content or "No response received"
+                RESPONSE_CACHE.put(cache_key, ai_response)
             
-            return ai_response
+            return self._record_answer(question, column_specific, ai_response)
             
         except Exception as e:
             return f"Error getting AI response: {str(e)}"
     
+    def _prepare_request(self, question: str, column_specific: Optional[str],
+                         current_data_state: Optional[Dict[str, Any]]):
+        """Build the chat completion arguments and their response-cache key"""
+        # Update context with current data state if provided
+        if current_data_state:
+            self._update_context_with_current_state(current_data_state)
+        
+        # Build context-aware prompt
+        system_prompt = self._build_system_prompt(column_specific)
+        user_message = self._build_user_message(question, column_specific)
+        
+        request = {
+            'model': self.model,
+            'messages': [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            'temperature': 0.1,
+            'max_tokens': 1500
+        }
+        cache_key = RESPONSE_CACHE.make_key(
+            model=self.model,
+            system=system_prompt,
+            user=normalize_question(user_message),
+            temperature=request['temperature'],
+            max_tokens=request['max_tokens']
+        )
+        return request, cache_key
+    
+    def _record_answer(self, question: str, column_specific: Optional[str], ai_response: str) -> str:
+        """Store the exchange in the conversation history"""
+        self.conversation_history.append({
+            'timestamp': datetime.now().isoformat(),
+            'question': question,
+            'column': column_specific,
+            'response': ai_response
+        })
+        return ai_response
+    
     def _update_context_with_current_state(self, current_state: Dict[str, Any]):
         """Update AI context with current application state"""
         if 'current_dataset_stats' in current_state:
@@ -215,6 +257,10 @@ class AIAssistant:
         if not self.client:
             return "AI assistant is not available."
         
+        return self.ask_question(self.build_intelligent_cleaning_question(column, analysis, df), column)
+    
+    def build_intelligent_cleaning_question(self, column: str, analysis: Dict[str, Any], df: pd.DataFrame) -> str:
+        """Run the pandas issue detection for a column and phrase it as a recommendation question"""
         # Update context with current column analysis
         self.context['current_column_analysis'] = analysis
         
@@ -248,7 +294,7 @@ Based on these SPECIFIC issues, provide CONCRETE cleaning recommendations:
 
 Be SPECIFIC and ACTIONABLE. Don't give generic advice - every recommendation should be tailored to the exact issues detected in this column."""
         
-        return self.ask_question(question, column)
+        return question
     
     def _detect_column_issues(self, analysis: Dict[str, Any], series: pd.Series) -> str:
         """Detect specific issues in a column and format them for the AI"""
@@ -375,6 +421,10 @@ Be SPECIFIC and ACTIONABLE. Don't give generic advice - every recommendation sho
         if not self.client:
             return "AI assistant is not available."
         
+        return self.ask_question(self.build_cleaning_question(column, analysis), column)
+    
+    def build_cleaning_question(self, column: str, analysis: Dict[str, Any]) -> str:
+        """Phrase a general cleaning-strategy question for a column"""
         # Update context with current column analysis
         self.context['current_column_analysis'] = analysis
         
@@ -386,7 +436,7 @@ Be SPECIFIC and ACTIONABLE. Don't give generic advice - every recommendation sho
         4. Any survey methodology considerations
         5. Suggested order of operations for cleaning this column"""
         
-        return self.ask_question(question, column)
+        return question
     
     def compare_methods(self, column: str, method1: str, method2: str, analysis: Dict[str, Any]) -> str:
         """Compare two cleaning methods for a specific column"""
@@ -3,55 +3,49 @@ AI-powered hypothesis test suggestion using Groq
 """
 import os
 import json
+import hashlib
+from functools import lru_cache
 from typing import Dict, List, Any
 
+from modules.response_cache import RESPONSE_CACHE
+
 try:
+    import httpx
     from groq import Groq
     GROQ_AVAILABLE = True
 except ImportError:
     GROQ_AVAILABLE = False
     Groq = None
 
-class AIHypothesisHelper:
-    """AI assistant for suggesting appropriate hypothesis tests"""
-    
-    def __init__(self):
-        self.client = None
-        self.api_key = os.getenv('GROQ_API_KEY')
-        if GROQ_AVAILABLE and self.api_key and Groq:
-            self.client = Groq(api_key=self.api_key)
-    
-    def suggest_test(self, user_prompt: str, data_context: Dict[str, Any], test_metadata: str) -> Dict[str, Any]:
-        """
-        Suggest appropriate statistical test based on user's natural language description
-        
-        Args:
-            user_prompt: User's description of what they want to test
-            data_context: Dict with 'numeric_columns', 'categorical_columns', 'sample_size', etc.
-            test_metadata: Formatted string of all available tests
-            
-        Returns:
-            Dict with suggestions including test_id, category, rationale, confidence
-        """
-        if not self.client:
-            return {
-                'success': False,
-                'error': 'Groq API key not configured. Please add GROQ_API_KEY to environment variables.',
-                'fallback': True
-            }
-        
-        # Build system prompt
-        system_prompt = f"""You are a statistical analysis expert helping users choose the right hypothesis test.
+HYPOTHESIS_MODEL = "llama-3.3-70b-versatile"
+JSON_RESPONSE_FORMAT = {"type": "json_object"}
+
+# Generation budgets sized to what the prompts ask for: a recommendation JSON fits well under
+# SUGGEST_MAX_TOKENS, and an explanation shrinks as the audience needs less hand-holding.
+SUGGEST_MAX_TOKENS = 700
+EXPLAIN_MAX_TOKENS = 350
+LEVEL_TOKEN_SCALE = {'beginner': 1.0, 'intermediate': 0.8, 'advanced': 0.6}
+
+
+def explanation_budget(user_level: str, count: int = 1) -> int:
+    """max_tokens for explaining `count` tests at the given level"""
+    return int(EXPLAIN_MAX_TOKENS * LEVEL_TOKEN_SCALE.get(user_level, 1.0)) * count
+
+
+@lru_cache(maxsize=4)
+def _shared_client(api_key: str):
+    """One Groq client per API key, so every helper instance reuses its keep-alive connections"""
+    return Groq(
+        api_key=api_key,
+        http_client=httpx.Client(limits=httpx.Limits(max_keepalive_connections=32))
+    )
+
+SUGGEST_SYSTEM_PROMPT = """You are a statistical analysis expert helping users choose the right hypothesis test.
 
 Available statistical tests:
 {test_metadata}
 
-Your task is to analyze the user's request and recommend the most appropriate statistical test(s).
-
-Data context available:
-- Numeric columns: {data_context.get('numeric_columns', [])}
-- Categorical columns: {data_context.get('categorical_columns', [])}
-- Sample size: {data_context.get('sample_size', 'unknown')}
+Your task is to analyze the user's request and the data columns it describes, and recommend the most appropriate statistical test(s).
 
 Respond in JSON format with:
 {{
@@ -65,7 +59,7 @@ Respond in JSON format with:
   "alternative_recommendations": [
     {{
       "test_id": "test_identifier",
-      "test_name": "Human-readable test name", 
+      "test_name": "Human-readable test name",
       "category": "parametric or non_parametric",
       "rationale": "Brief explanation"
     }}
@@ -79,6 +73,63 @@ Respond in JSON format with:
 
 Be concise, beginner-friendly, and always explain technical terms simply."""
 
+
+class AIHypothesisHelper:
+    """AI assistant for suggesting appropriate hypothesis tests"""
+    
+    def __init__(self):
+        self.client = None
+        self.api_key = os.getenv('GROQ_API_KEY')
+        if GROQ_AVAILABLE and self.api_key and Groq:
+            self.client = _shared_client(self.api_key)
+        # Static system prompts keyed by a hash of the test metadata, with rough
+        # token counts; cached_prompt_tokens tallies what the provider served
+        # from its prefix cache.
+        self._static_prompts: Dict[str, Dict[str, Any]] = {}
+        self.prompt_cache_stats = {'requests': 0, 'prompt_tokens': 0, 'cached_prompt_tokens': 0}
+    
+    def _static_system_prompt(self, test_metadata: str) -> str:
+        """Return the request-independent system prompt, built once per metadata version"""
+        digest = hashlib.sha256(test_metadata.encode('utf-8')).hexdigest()
+        entry = self._static_prompts.get(digest)
+        if entry is None:
+            prompt = SUGGEST_SYSTEM_PROMPT.format(test_metadata=test_metadata)
+            entry = {'prompt': prompt, 'approx_tokens': len(prompt) // 4}
+            self._static_prompts[digest] = entry
+        return entry['prompt']
+    
+    def _record_usage(self, response: Any):
+        usage = getattr(response, 'usage', None)
+        if usage is None:
+            return
+        self.prompt_cache_stats['requests'] += 1
+        self.prompt_cache_stats['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+        details = getattr(usage, 'prompt_tokens_details', None)
+        self.prompt_cache_stats['cached_prompt_tokens'] += getattr(details, 'cached_tokens', 0) or 0
+    
+    def suggest_test(self, user_prompt: str, data_context: Dict[str, Any], test_metadata: str) -> Dict[str, Any]:
+        """
+        Suggest appropriate statistical test based on user's natural language description
+        
+        Args:
+            user_prompt: User's description of what they want to test
+            data_context: Dict with 'numeric_columns', 'categorical_columns', 'sample_size', etc.
+            test_metadata: Formatted string of all available tests
+            
+        Returns:
+            Dict with suggestions including test_id, category, rationale, confidence
+        """
+        if not self.client:
+            return {
+                'success': False,
+                'error': 'Groq API key not configured. Please add GROQ_API_KEY to environment variables.',
+                'fallback': True
+            }
+        
+        # The system prompt is identical across requests so providers can reuse
+        # the cached prefix; everything request-specific goes in the user message.
+        system_prompt = self._static_system_prompt(test_metadata)
+
         user_message = f"""User wants to perform: {user_prompt}
 
 Available data columns:
@@ -91,16 +142,19 @@ Please recommend the most appropriate statistical test(s)."""
         try:
             # Call Groq API
             response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+                model=HYPOTHESIS_MODEL,
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_message}
                 ],
-                temperature=0.3,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
+                # Deterministic JSON: faster to generate and identical calls stay identical
+                temperature=0,
+                max_tokens=SUGGEST_MAX_TOKENS,
+                response_format=JSON_RESPONSE_FORMAT
             )
             
+            self._record_usage(response)
+            
             # Parse response
             content = response.choices[0].message.content
             suggestions = json.loads(content)
@@ -145,15 +199,95 @@ Include:
 
 Keep it concise and avoid jargon."""
 
+        max_tokens = explanation_budget(user_level)
+        cache_key = RESPONSE_CACHE.make_key(
+            model=HYPOTHESIS_MODEL,
+            user=prompt,
+            temperature=0.5,
+            max_tokens=max_tokens
+        )
+        cached = RESPONSE_CACHE.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
             response = self.client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
+                model=HYPOTHESIS_MODEL,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0.5,
-                max_tokens=500
+                max_tokens=max_tokens
             )
             
-            return response.choices[0].message.content.strip()
+            explanation = response.choices[0].message.content.strip()
+            RESPONSE_CACHE.put(cache_key, explanation)
+            return explanation
             
         except Exception as e:
             return f"Explanation unavailable: {str(e)}"
+    
+    def explain_tests(self, test_names: List[str], user_level: str = 'beginner') -> Dict[str, str]:
+        """
+        Get explanations for several statistical tests in a single API call
+        
+        Args:
+            test_names: Names of the tests to explain
+            user_level: 'beginner', 'intermediate', or 'advanced'
+            
+        Returns:
+            Dict mapping each test name to its explanation
+        """
+        if not self.client:
+            return {name: "Explanation unavailable - Groq API not configured." for name in test_names}
+        
+        explanations: Dict[str, str] = {}
+        cache_keys = {}
+        for name in dict.fromkeys(test_names):
+            cache_keys[name] = RESPONSE_CACHE.make_key(
+                model=HYPOTHESIS_MODEL, batch_explain=name, level=user_level
+            )
+            cached = RESPONSE_CACHE.get(cache_keys[name])
+            if cached is not None:
+                explanations[name] = cached
+        
+        pending = [name for name in cache_keys if name not in explanations]
+        if not pending:
+            return explanations
+        
+        labeled = '\n'.join(f"[{i}] {name}" for i, name in enumerate(pending, 1))
+        prompt = f"""Explain each statistical test below in {user_level}-friendly language.
+
+{labeled}
+
+For each test include:
+1. What it tests (1 sentence)
+2. When to use it (1-2 sentences)
+3. Key assumptions (bullet points)
+4. How to interpret results (1-2 sentences)
+
+Keep each explanation concise and avoid jargon.
+Respond in JSON format with one string per test, keyed by its bracketed number:
+{{"1": "explanation", "2": "explanation"}}"""
+
+        try:
+            response = self.client.chat.completions.create(
+                model=HYPOTHESIS_MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0,
+                max_tokens=min(explanation_budget(user_level, len(pending)), 4000),
+                response_format=JSON_RESPONSE_FORMAT
+            )
+            parsed = json.loads(response.choices[0].message.content)
+        except Exception as e:
+            for name in pending:
+                explanations[name] = f"Explanation unavailable: {str(e)}"
+            return explanations
+        
+        for i, name in enumerate(pending, 1):
+            explanation = parsed.get(str(i)) or parsed.get(name)
+            if isinstance(explanation, str) and explanation.strip():
+                explanations[name] = explanation.strip()
+                RESPONSE_CACHE.put(cache_keys[name], explanations[name])
+            else:
+                explanations[name] = "Explanation unavailable: missing from AI response."
+        
+        return explanations
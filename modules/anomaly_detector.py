@@ -3,18 +3,42 @@ Anomaly Detection Module
 Detects data type mismatches and formatting anomalies in dataset columns
 """
 
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 import re
 
 
+# Severe encoding issues: control characters other than \t \n \r, or the Unicode replacement character.
+# Not a raw string: the characters are embedded literally so Arrow-backed strings (RE2) accept it too.
+_TEXT_ANOMALY_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ufffd]')
+
+# Candidate layouts tried on a sample of datetime columns before falling back to format='mixed'.
+_COMMON_DATETIME_FORMATS = ('ISO8601', '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%d-%m-%Y', '%b %d %Y')
+
+# Categorical anomalies: characters outside ASCII/Latin-1 (possible corruption), or leading/trailing
+# whitespace as str.strip() sees it. Whitespace beyond Latin-1 is already covered by the first test.
+_STRIP_WHITESPACE = '[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0]'
+_CATEGORICAL_ANOMALY_RE = re.compile(
+    '[^\x00-\xff]|^' + _STRIP_WHITESPACE + '|' + _STRIP_WHITESPACE + '$'
+)
+
+
 class AnomalyDetector:
     """Detects type mismatches and formatting anomalies in dataset columns"""
     
-    def __init__(self):
-        self.anomaly_cache = {}
+    def __init__(self, max_cached_columns: int = 256):
+        # (column, expected_type, content hash) -> result; results are shared, treat as read-only
+        self.anomaly_cache: "OrderedDict[Tuple[Any, str, str], Dict[str, Any]]" = OrderedDict()
+        self.max_cached_columns = max_cached_columns
+        self._cache_lock = threading.Lock()
     
     def detect_column_anomalies(self, df: pd.DataFrame, column: str, 
                                 expected_type: str) -> Dict[str, Any]:
@@ -29,7 +53,57 @@ class AnomalyDetector:
         Returns:
             Dictionary containing anomaly information
         """
-        series = df[column].copy()
+        series = df[column]
+        fingerprint = self._series_fingerprint(series)
+        if fingerprint is None:
+            return self._scan_column(series, column, expected_type)
+        
+        cache_key = (column, expected_type, fingerprint)
+        with self._cache_lock:
+            cached = self.anomaly_cache.get(cache_key)
+            if cached is not None:
+                self.anomaly_cache.move_to_end(cache_key)
+                return cached
+        
+        anomalies = self._scan_column(series, column, expected_type)
+        
+        with self._cache_lock:
+            self.anomaly_cache[cache_key] = anomalies
+            while len(self.anomaly_cache) > self.max_cached_columns:
+                self.anomaly_cache.popitem(last=False)
+        return anomalies
+    
+    @staticmethod
+    def _series_fingerprint(series: pd.Series) -> Optional[str]:
+        """Hash of a column's dtype, index and values; far cheaper than re-scanning it"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(str(series.dtype).encode('utf-8'))
+        index = series.index
+        try:
+            if isinstance(index, pd.RangeIndex):
+                digest.update(repr((index.start, index.stop, index.step)).encode('utf-8'))
+            else:
+                digest.update(pd.util.hash_pandas_object(index).to_numpy().tobytes())
+            
+            values = series.array
+            if hasattr(values, '__arrow_array__'):
+                # Arrow-backed (e.g. the default string dtype): hash the buffers directly,
+                # which is much faster than hashing each string.
+                arrow = values.__arrow_array__()
+                for chunk in getattr(arrow, 'chunks', [arrow]):
+                    digest.update(repr((chunk.offset, len(chunk))).encode('utf-8'))
+                    for buffer in chunk.buffers():
+                        if buffer is not None:
+                            digest.update(buffer)
+            else:
+                digest.update(pd.util.hash_pandas_object(series, index=False).to_numpy().tobytes())
+        except TypeError:
+            # Unhashable cell values (lists, dicts): skip caching for this column
+            return None
+        return digest.hexdigest()
+    
+    def _scan_column(self, series: pd.Series, column: str, expected_type: str) -> Dict[str, Any]:
+        """Run the type-specific anomaly checks for one column"""
         anomalies = {
             'column': column,
             'expected_type': expected_type,
@@ -86,29 +160,25 @@ class AnomalyDetector:
     
     def _detect_numeric_anomalies(self, series: pd.Series, expected_type: str) -> List[int]:
         """Detect values that cannot be converted to numeric"""
-        anomaly_indices = []
+        coerced = pd.to_numeric(series, errors='coerce')
+        values = coerced.to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
         
-        for idx, value in series.items():
+        # to_numeric is stricter than float() (e.g. padded strings, bytes); re-check
+        # only the values it rejected, so the common all-valid case stays vectorized.
+        rejected = np.flatnonzero(coerced.isna().to_numpy() & series.notna().to_numpy())
+        for pos in rejected:
             try:
-                # Try to convert to numeric
-                if expected_type == 'integer':
-                    # Check if it can be converted to integer
-                    float_val = float(value)
-                    if not np.isfinite(float_val):
-                        anomaly_indices.append(idx)
-                    elif float_val != int(float_val):
-                        # Has decimal part - not a valid integer
-                        anomaly_indices.append(idx)
-                else:
-                    # Continuous or ordinal - just needs to be numeric
-                    float_val = float(value)
-                    if not np.isfinite(float_val):
-                        anomaly_indices.append(idx)
+                value = float(series.iloc[pos])
             except (ValueError, TypeError):
-                # Cannot convert to numeric
-                anomaly_indices.append(idx)
+                continue
+            values[pos] = value
+        
+        anomalous = ~np.isfinite(values)
+        if expected_type == 'integer':
+            # Has decimal part - not a valid integer
+            anomalous |= np.modf(values)[0] != 0
         
-        return anomaly_indices
+        return series.index[anomalous].tolist()
     
     def _detect_binary_anomalies(self, series: pd.Series) -> List[int]:
         """Detect values that don't fit binary pattern (should have exactly 2 unique values)"""
@@ -118,69 +188,77 @@ class AnomalyDetector:
         if len(unique_values) > 2:
             # Find which values are anomalous (least frequent ones)
             value_counts = series.value_counts()
-            top_2_values = set(value_counts.head(2).index)
+            top_2_values = value_counts.head(2).index
             
-            anomaly_indices = []
-            for idx, value in series.items():
-                if value not in top_2_values:
-                    anomaly_indices.append(idx)
-            
-            return anomaly_indices
+            return series.index[~series.isin(top_2_values)].tolist()
         
         return []
     
     def _detect_categorical_anomalies(self, series: pd.Series) -> List[int]:
         """Detect potential anomalies in categorical data (encoding issues, inconsistent formatting)"""
-        anomaly_indices = []
+        # One regex pass flags both encoding issues and leading/trailing whitespace
+        flagged = series.astype(str).str.contains(_CATEGORICAL_ANOMALY_RE)
         
-        # Check for encoding issues or special characters that might indicate data corruption
-        for idx, value in series.items():
-            value_str = str(value)
-            
-            # Check for encoding issues
-            if any(ord(char) > 127 and ord(char) not in range(128, 256) for char in value_str):
-                # Potential encoding issue (non-ASCII, non-Latin1)
-                anomaly_indices.append(idx)
-            
-            # Check for excessive whitespace or formatting issues
-            elif len(value_str) != len(value_str.strip()):
-                # Leading/trailing whitespace might indicate data quality issue
-                anomaly_indices.append(idx)
-            
-            # Check for mixed case inconsistency if most values follow a pattern
-            # (This is more of a quality issue than anomaly, so we're lenient)
-        
-        return anomaly_indices
+        # Mixed case inconsistency is more of a quality issue than anomaly, so we're lenient
+        return series.index[flagged.to_numpy(dtype=bool)].tolist()
     
     def _detect_datetime_anomalies(self, series: pd.Series) -> List[int]:
         """Detect values that cannot be parsed as datetime"""
-        anomaly_indices = []
+        candidates = np.arange(len(series))
         
-        for idx, value in series.items():
+        # Stage 1: most string columns share one layout; a fixed-format parse stays on
+        # pandas' fast path and clears the bulk of the column.
+        fmt = self._dominant_datetime_format(series)
+        if fmt is not None:
+            try:
+                parsed = pd.to_datetime(series, errors='coerce', format=fmt, utc=True)
+                candidates = np.flatnonzero(parsed.isna().to_numpy())
+            except (ValueError, TypeError, OverflowError):
+                pass
+        
+        # Stage 2: whatever is left goes through the slower per-value format inference.
+        # utc=True lets values with different UTC offsets share one parse.
+        if len(candidates) > 0:
             try:
-                pd.to_datetime(value)
+                parsed = pd.to_datetime(series.iloc[candidates], errors='coerce', format='mixed', utc=True)
+                candidates = candidates[parsed.isna().to_numpy()]
+            except (ValueError, TypeError, OverflowError):
+                pass
+        
+        # Batch parsing rejects some values the scalar parser accepts; only those are re-checked.
+        anomaly_positions = []
+        for pos in candidates:
+            try:
+                pd.to_datetime(series.iloc[pos])
             except (ValueError, TypeError, pd.errors.OutOfBoundsDatetime):
-                anomaly_indices.append(idx)
+                anomaly_positions.append(pos)
         
-        return anomaly_indices
+        return series.index[anomaly_positions].tolist()
+    
+    @staticmethod
+    def _dominant_datetime_format(series: pd.Series, sample_size: int = 100,
+                                  min_success: float = 0.9) -> Optional[str]:
+        """Pick the common format that parses (nearly) all of a sample of a string column"""
+        if pd.api.types.infer_dtype(series, skipna=True) != 'string':
+            return None
+        
+        positions = np.unique(np.linspace(0, len(series) - 1, min(len(series), sample_size)).astype(np.int64))
+        sample = series.iloc[positions]
+        best_format, best_rate = None, 0.0
+        for fmt in _COMMON_DATETIME_FORMATS:
+            try:
+                rate = pd.to_datetime(sample, errors='coerce', format=fmt, utc=True).notna().mean()
+            except (ValueError, TypeError, OverflowError):
+                continue
+            if rate > best_rate:
+                best_format, best_rate = fmt, rate
+        return best_format if best_rate >= min_success else None
     
     def _detect_text_anomalies(self, series: pd.Series) -> List[int]:
         """Detect encoding or formatting issues in text columns"""
-        anomaly_indices = []
-        
-        for idx, value in series.items():
-            value_str = str(value)
-            
-            # Check for severe encoding issues or control characters
-            if any(ord(char) < 32 and char not in '\n\r\t' for char in value_str):
-                # Control characters (except newline, carriage return, tab)
-                anomaly_indices.append(idx)
-            
-            # Check for replacement characters indicating encoding issues
-            elif '\ufffd' in value_str:  # Unicode replacement character
-                anomaly_indices.append(idx)
-        
-        return anomaly_indices
+        # Control characters (except newline, carriage return, tab) or replacement characters
+        mask = series.astype(str).str.contains(_TEXT_ANOMALY_RE)
+        return series.index[mask.to_numpy(dtype=bool)].tolist()
     
     def _get_anomaly_reason(self, value: Any, expected_type: str) -> str:
         """Generate human-readable reason for why a value is anomalous"""
@@ -213,6 +291,17 @@ class AnomalyDetector:
         
         return 'Does not match expected format'
     
+    @staticmethod
+    def _apply_scatter(df: pd.DataFrame, column: str, row_indices: List[int], values: Any) -> pd.DataFrame:
+        """Return a new frame with df.loc[row_indices, column] = values; df itself is left untouched.
+        
+        Only the target column is copied; every other column stays shared with df.
+        """
+        result = df.copy(deep=False)
+        result[column] = df[column].copy()
+        result.loc[row_indices, column] = values
+        return result
+    
     def remove_anomalies(self, df: pd.DataFrame, column: str, 
                         anomaly_indices: List[int]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         """
@@ -226,13 +315,8 @@ class AnomalyDetector:
         Returns:
             Tuple of (cleaned DataFrame, operation summary)
         """
-        import numpy as np
-        
-        cleaned_df = df.copy()
-        
         # Set anomalous cell values to NaN instead of removing entire rows
-        for idx in anomaly_indices:
-            cleaned_df.at[idx, column] = np.nan
+        cleaned_df = self._apply_scatter(df, column, anomaly_indices, np.nan)
         
         summary = {
             'operation': 'remove_anomalies',
@@ -251,7 +335,7 @@ class AnomalyDetector:
         Replace a specific anomalous value
         
         Args:
-            df: DataFrame to modify
+            df: DataFrame to update (not modified; a new frame is returned)
             row_index: Index of the row to replace
             column: Column name
             new_value: New value to set
@@ -260,7 +344,7 @@ class AnomalyDetector:
             Tuple of (modified DataFrame, operation summary)
         """
         old_value = df.at[row_index, column]
-        df.at[row_index, column] = new_value
+        df = self._apply_scatter(df, column, [row_index], new_value)
         
         summary = {
             'operation': 'replace_anomaly',
@@ -279,23 +363,22 @@ class AnomalyDetector:
         Replace multiple anomalies at once
         
         Args:
-            df: DataFrame to modify
+            df: DataFrame to update (not modified; a new frame is returned)
             column: Column name
             replacements: Dictionary mapping row_index -> new_value
         
         Returns:
             Tuple of (modified DataFrame, operation summary)
         """
-        modifications = []
-        
-        for row_index, new_value in replacements.items():
-            old_value = df.at[row_index, column]
-            df.at[row_index, column] = new_value
-            modifications.append({
-                'row_index': row_index,
-                'old_value': old_value,
-                'new_value': new_value
-            })
+        row_indices = list(replacements.keys())
+        new_values = list(replacements.values())
+        old_values = df.loc[row_indices, column].tolist()
+        df = self._apply_scatter(df, column, row_indices, new_values)
+        
+        modifications = [
+            {'row_index': row_index, 'old_value': old_value, 'new_value': new_value}
+            for row_index, old_value, new_value in zip(row_indices, old_values, new_values)
+        ]
         
         summary = {
             'operation': 'batch_replace_anomalies',
@@ -308,23 +391,36 @@ class AnomalyDetector:
         return df, summary
     
     def detect_all_anomalies(self, df: pd.DataFrame, 
-                            column_types: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+                            column_types: Dict[str, str],
+                            max_workers: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
         """
         Detect anomalies in all columns based on their expected types
         
         Args:
             df: DataFrame to analyze
             column_types: Dictionary mapping column names to expected types
+            max_workers: Threads used to scan columns concurrently (defaults to the CPU count)
         
         Returns:
             Dictionary mapping column names to their anomaly information
         """
-        all_anomalies = {}
+        jobs = [(column, expected_type) for column, expected_type in column_types.items()
+                if column in df.columns]
+        workers = min(max_workers or os.cpu_count() or 1, len(jobs))
+        
+        # Columns are independent and the heavy lifting (to_numeric, to_datetime,
+        # string kernels) runs in C, so threads overlap well.
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(
+                    lambda job: self.detect_column_anomalies(df, *job), jobs
+                ))
+        else:
+            results = [self.detect_column_anomalies(df, *job) for job in jobs]
         
-        for column, expected_type in column_types.items():
-            if column in df.columns:
-                anomalies = self.detect_column_anomalies(df, column, expected_type)
-                if anomalies['anomaly_count'] > 0:
-                    all_anomalies[column] = anomalies
+        all_anomalies = {}
+        for (column, _), anomalies in zip(jobs, results):
+            if anomalies['anomaly_count'] > 0:
+                all_anomalies[column] = anomalies
         
         return all_anomalies
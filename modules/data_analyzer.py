@@ -154,46 +154,52 @@ class ColumnAnalyzer:
         
         outlier_results = {}
         
+        # All methods mark outliers on one contiguous float64 buffer; a single
+        # percentile call gives the quartiles and the median for modified z.
+        raw = non_null_series.to_numpy()
+        values = raw.astype(np.float64, copy=False)
+        n = len(values)
+        
         # IQR Method - vectorized calculation
-        Q1, Q3 = non_null_series.quantile([0.25, 0.75])
+        Q1, median, Q3 = np.percentile(values, [25, 50, 75]).tolist()
         IQR = Q3 - Q1
         lower_bound = Q1 - 1.5 * IQR
         upper_bound = Q3 + 1.5 * IQR
         
-        iqr_mask = (non_null_series < lower_bound) | (non_null_series > upper_bound)
-        iqr_outliers = non_null_series[iqr_mask]
+        iqr_mask = (values < lower_bound) | (values > upper_bound)
+        iqr_count = int(np.count_nonzero(iqr_mask))
         outlier_results['iqr'] = {
             'method': 'Interquartile Range (IQR)',
-            'outlier_count': len(iqr_outliers),
-            'outlier_percentage': (len(iqr_outliers) / len(non_null_series)) * 100,
+            'outlier_count': iqr_count,
+            'outlier_percentage': (iqr_count / n) * 100,
             'lower_bound': lower_bound,
             'upper_bound': upper_bound,
-            'outlier_values': iqr_outliers.tolist()[:20]  # Limit to 20 for display
+            'outlier_values': raw[iqr_mask][:20].tolist()  # Limit to 20 for display
         }
         
         # Z-Score Method (only for larger samples where it's more reliable)
-        if len(non_null_series) >= 10:
-            z_scores = np.abs(stats.zscore(non_null_series))
-            z_outliers = non_null_series[z_scores > 3]
+        if n >= 10:
+            z_mask = np.abs(stats.zscore(values)) > 3
+            z_count = int(np.count_nonzero(z_mask))
             outlier_results['zscore'] = {
                 'method': 'Z-Score (|z| > 3)',
-                'outlier_count': len(z_outliers),
-                'outlier_percentage': (len(z_outliers) / len(non_null_series)) * 100,
+                'outlier_count': z_count,
+                'outlier_percentage': (z_count / n) * 100,
                 'threshold': 3,
-                'outlier_values': z_outliers.tolist()[:20]
+                'outlier_values': raw[z_mask][:20].tolist()
             }
             
             # Modified Z-Score Method
-            median = np.median(non_null_series)
-            mad = np.median(np.abs(non_null_series - median))
-            modified_z_scores = 0.6745 * (non_null_series - median) / mad if mad != 0 else np.zeros(len(non_null_series))
-            modified_z_outliers = non_null_series[np.abs(modified_z_scores) > 3.5]
+            mad = np.median(np.abs(values - median))
+            modified_z_scores = 0.6745 * (values - median) / mad if mad != 0 else np.zeros(n)
+            modified_z_mask = np.abs(modified_z_scores) > 3.5
+            modified_z_count = int(np.count_nonzero(modified_z_mask))
             outlier_results['modified_zscore'] = {
                 'method': 'Modified Z-Score (|Mz| > 3.5)',
-                'outlier_count': len(modified_z_outliers),
-                'outlier_percentage': (len(modified_z_outliers) / len(non_null_series)) * 100,
+                'outlier_count': modified_z_count,
+                'outlier_percentage': (modified_z_count / n) * 100,
                 'threshold': 3.5,
-                'outlier_values': modified_z_outliers.tolist()[:20]
+                'outlier_values': raw[modified_z_mask][:20].tolist()
             }
         else:
             # For small samples, add a note about why some methods are skipped
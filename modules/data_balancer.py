@@ -1,14 +1,181 @@
 import pandas as pd
 import numpy as np
+from collections import OrderedDict
+from functools import lru_cache
 from typing import Dict, Tuple, List, Any, Optional
 from sklearn.model_selection import train_test_split
-from sklearn.preprocessing import LabelEncoder
+from sklearn.base import BaseEstimator
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.neighbors import NearestNeighbors
+from joblib import Parallel, delayed, effective_n_jobs
+from scipy.sparse import csr_matrix
+
+try:
+    import faiss
+    FAISS_AVAILABLE = True
+except ImportError:
+    FAISS_AVAILABLE = False
+    faiss = None
+
+
+class LabelCodes:
+    """Maps integer class codes back to the original target labels (LabelEncoder-compatible)"""
+    
+    def __init__(self, categories: np.ndarray):
+        self.classes_ = categories
+        # Numeric categories that are exactly 0..k-1 (e.g. False/True, integer categoricals)
+        # decode with a cast, which is cheaper than gathering through classes_
+        self._identity = categories.dtype.kind in 'biu' and np.array_equal(categories, np.arange(len(categories)))
+    
+    def inverse_transform(self, codes: np.ndarray) -> np.ndarray:
+        if self._identity:
+            return codes.astype(self.classes_.dtype)
+        return self.classes_[codes]
+
+
+# Neighbor ranking only needs float32 precision, at half the memory traffic of float64. Samplers
+# that keep a subset of rows search in float32 and return the original rows; samplers that
+# synthesize new points (SMOTE, hybrids, Cluster Centroids' KMeans) stay in the input dtype.
+NEIGHBOR_SEARCH_DTYPE = np.float32
+
+# Methods whose only job is to even out class counts, so on already-balanced data they return
+# (nearly) the input. Cleaning methods (Tomek, ENN, CNN, OSS, NCR and the hybrids) still
+# remove noisy or borderline rows from balanced data and always run.
+RATIO_DRIVEN_METHODS = {
+    'Random Oversampling', 'SMOTE', 'Random Undersampling',
+    'NearMiss-1', 'NearMiss-2', 'NearMiss-3', 'Cluster Centroids',
+}
+
+# Cluster Centroids switches from full KMeans to mini-batch KMeans from this many rows, where
+# it runs roughly 10x faster; smaller inputs keep the exact clustering.
+MINIBATCH_KMEANS_MIN_ROWS = 50_000
+
+# Tomek Links searches neighbours over distinct rows only when there are enough rows and most
+# of them are repeats; below that, np.unique's sort costs more than the search it saves.
+DEDUP_MIN_ROWS = 10_000
+DEDUP_MAX_UNIQUE_RATIO = 0.5
+
+
+def _duplicate_aware_tomek_links(tomek_links: type) -> type:
+    """TomekLinks whose nearest-neighbour search skips repeated rows
+    
+    A row with an identical twin of the same class has that twin as its nearest neighbour, so
+    it never forms a link and no other row can be its mutual neighbour. Searching the distinct
+    rows and pointing such rows at themselves gives the same links as the full search. Data with
+    identical rows of different classes (whose links depend on tie order) is searched in full.
+    ENN and CNN get no such shortcut: ENN's neighbourhood votes count every twin, and CNN's
+    result depends on the order in which rows are absorbed.
+    """
+    class DuplicateAwareTomekLinks(tomek_links):
+        def _fit_resample(self, X, y):
+            if len(X) <= DEDUP_MIN_ROWS:
+                return super()._fit_resample(X, y)
+            X_unique, first, inverse, counts = np.unique(
+                X, axis=0, return_index=True, return_inverse=True, return_counts=True
+            )
+            inverse = inverse.ravel()
+            if len(X_unique) >= DEDUP_MAX_UNIQUE_RATIO * len(X) or np.any(y != y[first[inverse]]):
+                return super()._fit_resample(X, y)
+            
+            nn = NearestNeighbors(n_neighbors=2, n_jobs=self.n_jobs)
+            nn.fit(X_unique)
+            nns = first[nn.kneighbors(X_unique, return_distance=False)[:, 1]][inverse]
+            repeated = counts[inverse] > 1
+            nns[repeated] = np.flatnonzero(repeated)
+            
+            links = self.is_tomek(y, nns, self.sampling_strategy_)
+            self.sample_indices_ = np.flatnonzero(np.logical_not(links))
+            return X[self.sample_indices_], y[self.sample_indices_]
+    
+    return DuplicateAwareTomekLinks
+
+
+class HNSWNearestNeighbors(BaseEstimator):
+    """Approximate stand-in for sklearn's NearestNeighbors, backed by a FAISS HNSW index
+    
+    imblearn accepts any clonable object with `kneighbors`/`kneighbors_graph` as the neighbour
+    search of SMOTE and ENN. Fits on fewer than `min_rows` rows (or without FAISS) fall back to
+    exact sklearn search, where building the graph would not pay for itself.
+    """
+    
+    def __init__(self, n_neighbors: int = 5, M: int = 32, ef_search: int = 64, min_rows: int = 50_000, n_jobs: Optional[int] = None):
+        self.n_neighbors = n_neighbors
+        self.M = M
+        self.ef_search = ef_search
+        self.min_rows = min_rows
+        self.n_jobs = n_jobs
+    
+    def fit(self, X: np.ndarray, y: Optional[np.ndarray] = None) -> 'HNSWNearestNeighbors':
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        self.n_samples_fit_ = len(X)
+        if not FAISS_AVAILABLE or len(X) < self.min_rows:
+            self.index_ = NearestNeighbors(n_neighbors=self.n_neighbors, n_jobs=self.n_jobs).fit(X)
+        else:
+            self.index_ = faiss.IndexHNSWFlat(X.shape[1], self.M)
+            self.index_.hnsw.efSearch = max(self.ef_search, self.n_neighbors)
+            self.index_.add(X)
+        return self
+    
+    def kneighbors(self, X: np.ndarray, n_neighbors: Optional[int] = None, return_distance: bool = True):
+        n_neighbors = n_neighbors or self.n_neighbors
+        if isinstance(self.index_, NearestNeighbors):
+            return self.index_.kneighbors(X, n_neighbors, return_distance)
+        # FAISS reports squared L2 distances
+        distances, indices = self.index_.search(np.ascontiguousarray(X, dtype=np.float32), n_neighbors)
+        if return_distance:
+            return np.sqrt(np.maximum(distances, 0)), indices
+        return indices
+    
+    def kneighbors_graph(self, X: np.ndarray, n_neighbors: Optional[int] = None, mode: str = 'connectivity') -> csr_matrix:
+        n_neighbors = n_neighbors or self.n_neighbors
+        distances, indices = self.kneighbors(X, n_neighbors, return_distance=True)
+        data = distances.ravel() if mode == 'distance' else np.ones(indices.size)
+        indptr = np.arange(0, indices.size + 1, n_neighbors)
+        return csr_matrix((data, indices.ravel(), indptr), shape=(len(indices), self.n_samples_fit_))
+
+
+@lru_cache(maxsize=1)
+def _load_samplers() -> Dict[str, type]:
+    """imblearn sampler classes by name, imported on first use (imblearn is slow to import)"""
+    from imblearn.combine import SMOTEENN, SMOTETomek
+    from imblearn.over_sampling import SMOTE, RandomOverSampler
+    from imblearn.under_sampling import (
+        ClusterCentroids,
+        CondensedNearestNeighbour,
+        EditedNearestNeighbours,
+        NearMiss,
+        NeighbourhoodCleaningRule,
+        OneSidedSelection,
+        RandomUnderSampler,
+        TomekLinks,
+    )
+    return {
+        'RandomOverSampler': RandomOverSampler,
+        'SMOTE': SMOTE,
+        'RandomUnderSampler': RandomUnderSampler,
+        'TomekLinks': _duplicate_aware_tomek_links(TomekLinks),
+        'NearMiss': NearMiss,
+        'EditedNearestNeighbours': EditedNearestNeighbours,
+        'CondensedNearestNeighbour': CondensedNearestNeighbour,
+        'OneSidedSelection': OneSidedSelection,
+        'ClusterCentroids': ClusterCentroids,
+        'NeighbourhoodCleaningRule': NeighbourhoodCleaningRule,
+        'SMOTETomek': SMOTETomek,
+        'SMOTEENN': SMOTEENN,
+    }
 
 
 class DataBalancer:
     """Handles various data balancing techniques for imbalanced datasets"""
     
-    def __init__(self):
+    def __init__(self, nn_backend: str = 'sklearn', nn_backend_threshold: int = 50_000, cluster_batch_size: int = 1024):
+        """nn_backend='faiss' switches the SMOTE-family and ENN neighbour searches to approximate
+        HNSW search for fits of at least nn_backend_threshold rows (exact sklearn search when
+        FAISS is not installed). cluster_batch_size is the mini-batch size Cluster Centroids uses
+        on large inputs."""
+        self.nn_backend = nn_backend
+        self.nn_backend_threshold = nn_backend_threshold
+        self.cluster_batch_size = cluster_batch_size
         self.balancing_methods = {
             'Random Oversampling': self._random_oversampling,
             'SMOTE': self._smote,
@@ -25,8 +192,16 @@ class DataBalancer:
             'SMOTE + Tomek Links': self._smote_tomek,
             'SMOTE + ENN': self._smote_enn,
         }
-        self._label_encoder = None
-        self._target_was_encoded = False
+        # Encoded targets of recent balance calls, so trying several methods on the same
+        # target column encodes it once. See _target_cache_key for what is cacheable.
+        self._encode_cache: "OrderedDict[tuple, Tuple[Any, np.ndarray, LabelCodes]]" = OrderedDict()
+        self._max_cached_targets = 8
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Sent to joblib workers by balance_data_batch, which have no use for the encoded targets
+        state = self.__dict__.copy()
+        state['_encode_cache'] = OrderedDict()
+        return state
     
     def get_available_methods(self) -> Dict[str, List[str]]:
         """Return categorized list of available balancing methods"""
@@ -73,14 +248,18 @@ class DataBalancer:
             elif unique_vals > 10:
                 warnings.append(f"Target column has {unique_vals} classes. Balancing works best with fewer classes.")
         
-        categorical_features = []
-        for col in feature_cols:
-            if col in df.columns:
-                if df[col].isnull().any():
-                    errors.append(f"Feature column '{col}' contains missing values. Please clean this column using the Cleaning Wizard first.")
-                
-                if not pd.api.types.is_numeric_dtype(df[col]):
-                    categorical_features.append(col)
+        present = [col for col in feature_cols if col in df.columns]
+        features = df[present]
+        # One block-wise null scan for all features, and dtype checks straight off the dtypes
+        has_nulls = features.isnull().any(axis=0).to_numpy()
+        for col, missing in zip(present, has_nulls):
+            if missing:
+                errors.append(f"Feature column '{col}' contains missing values. Please clean this column using the Cleaning Wizard first.")
+        
+        categorical_features = [
+            col for col, dtype in zip(present, features.dtypes)
+            if not pd.api.types.is_numeric_dtype(dtype)
+        ]
         
         if categorical_features:
             errors.append(f"Feature columns {categorical_features} are not numeric. Balancing requires numeric features. Please encode categorical variables using the Column Analysis page before balancing, or select only numeric columns.")
@@ -96,7 +275,17 @@ class DataBalancer:
     
     def get_class_distribution(self, df: pd.DataFrame, target_col: str) -> pd.Series:
         """Get the distribution of classes in the target column"""
-        return df[target_col].value_counts().sort_index()
+        return self._class_counts(df[target_col])
+    
+    @staticmethod
+    def _class_counts(y: pd.Series) -> pd.Series:
+        """value_counts().sort_index(), with a single bincount pass for small non-negative integer labels"""
+        values = y.to_numpy()
+        if values.dtype.kind in 'iu' and values.size and values.min() >= 0 and values.max() <= values.size:
+            counts = np.bincount(values)
+            labels = np.flatnonzero(counts)
+            return pd.Series(counts[labels], index=pd.Index(labels.astype(values.dtype), name=y.name), name='count')
+        return y.value_counts().sort_index()
     
     def stratified_split(
         self,
@@ -108,30 +297,26 @@ class DataBalancer:
     ) -> Dict[str, Any]:
         """Perform stratified train/test split"""
         try:
-            X = df[feature_cols].copy()
-            y = df[target_col].copy()
+            # Features and target are split together: one row take per side, whose result is
+            # already a new frame, so nothing needs copying or re-attaching afterwards.
+            y = df[target_col]
+            data = df[list(dict.fromkeys(feature_cols + [target_col]))]
             
-            X_train, X_test, y_train, y_test = train_test_split(
-                X, y, 
+            train_df, test_df = train_test_split(
+                data, 
                 test_size=test_size, 
                 stratify=y, 
                 random_state=random_state
             )
             
-            train_df = X_train.copy()
-            train_df[target_col] = y_train
-            
-            test_df = X_test.copy()
-            test_df[target_col] = y_test
-            
             return {
                 'success': True,
                 'train_data': train_df,
                 'test_data': test_df,
                 'train_size': len(train_df),
                 'test_size': len(test_df),
-                'train_distribution': y_train.value_counts().sort_index(),
-                'test_distribution': y_test.value_counts().sort_index()
+                'train_distribution': self._class_counts(train_df[target_col]),
+                'test_distribution': self._class_counts(test_df[target_col])
             }
         except Exception as e:
             return {
@@ -139,84 +324,240 @@ class DataBalancer:
                 'error': f"Error during stratified split: {str(e)}"
             }
     
-    def _prepare_features(self, X: np.ndarray) -> np.ndarray:
+    def _prepare_features(self, X: np.ndarray, dtype: type = np.float64) -> np.ndarray:
         """Prepare feature data for sampling - ensure proper NumPy array with correct dtype"""
-        X_prepared = np.asarray(X, dtype=np.float64)
+        # Row-major (order='C'): sklearn.neighbors reads one sample (row) at a time, so each
+        # row should be contiguous. Frames built column by column hand back Fortran order.
+        X_prepared = np.ascontiguousarray(X, dtype=dtype)
         if X_prepared.ndim == 1:
             X_prepared = X_prepared.reshape(-1, 1)
         return X_prepared
     
-    def _prepare_target(self, y: np.ndarray) -> Tuple[np.ndarray, Optional[LabelEncoder], bool]:
-        """Prepare target data for sampling - encode if non-numeric, return encoder for inverse transform"""
-        y_prepared = np.asarray(y).ravel()
-        
-        if not np.issubdtype(y_prepared.dtype, np.number):
-            le = LabelEncoder()
-            y_encoded = le.fit_transform(y_prepared)
-            return y_encoded, le, True
+    @staticmethod
+    def _target_cache_key(y: pd.Series) -> Optional[Tuple[tuple, Any]]:
+        """Identity key for Arrow-backed targets (e.g. the default string dtype), plus the Arrow
+        array it was taken from. Arrow buffers are immutable, so while the cache holds that array
+        the same buffer addresses, offsets and lengths always hold the same labels; the key costs
+        O(1) where hashing the values would cost about as much as encoding them. Other dtypes
+        (mutable NumPy object arrays) are not cached."""
+        values = y.array
+        if not hasattr(values, '__arrow_array__'):
+            return None
+        arrow = values.__arrow_array__()
+        key = [str(y.dtype)]
+        for chunk in getattr(arrow, 'chunks', [arrow]):
+            key.append((chunk.offset, len(chunk)) + tuple(
+                (buffer.address, buffer.size) if buffer is not None else None for buffer in chunk.buffers()
+            ))
+        return tuple(key), arrow
+    
+    @staticmethod
+    def _feature_matrix(df: pd.DataFrame, dtype: type, chunk_rows: int = 65_536) -> np.ndarray:
+        """df as a single C-ordered matrix of `dtype`, filled a block of rows at a time
         
-        return y_prepared, None, False
+        DataFrame.to_numpy interleaves columns into Fortran order, which _prepare_features would
+        then copy again into row-major order. Filling the final array by row chunks keeps each
+        interleave cache-sized and allocates the full matrix once (half the peak memory); the
+        samplers' check_array accepts it without another copy.
+        """
+        X = np.empty(df.shape, dtype=dtype)
+        for start in range(0, len(df), chunk_rows):
+            X[start:start + chunk_rows] = df.iloc[start:start + chunk_rows].to_numpy(dtype=dtype)
+        return X
     
-    def _safe_fit_resample(self, sampler, X: np.ndarray, y: np.ndarray, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
-        """Safely apply fit_resample with proper error handling and label restoration"""
-        try:
-            X_resampled, y_resampled = sampler.fit_resample(X, y)
+    def _prepare_target(self, y: pd.Series) -> Tuple[np.ndarray, Optional[LabelCodes]]:
+        """Prepare target data for sampling - encode if non-numeric, return encoder for inverse transform"""
+        if isinstance(y.dtype, pd.CategoricalDtype):
+            categorical = y.array
+        else:
+            # Looked up first: a hit also skips np.asarray, which copies strings out to objects
+            cache_entry = self._target_cache_key(y)
+            if cache_entry is not None and cache_entry[0] in self._encode_cache:
+                self._encode_cache.move_to_end(cache_entry[0])
+                _, codes, label_codes = self._encode_cache[cache_entry[0]]
+                return codes, label_codes
             
-            if was_encoded and label_encoder is not None:
-                y_resampled = label_encoder.inverse_transform(y_resampled)
+            y_prepared = np.asarray(y).ravel()
+            if np.issubdtype(y_prepared.dtype, np.number):
+                return y_prepared, None
             
+            # Categorical codes come out of pandas' hash table as compact int8/int16,
+            # cheaper than LabelEncoder; categories are sorted just like LabelEncoder.classes_.
+            categorical = pd.Categorical(y)
+            codes = np.asarray(categorical.codes)
+            label_codes = LabelCodes(categorical.categories.to_numpy())
+            if cache_entry is not None:
+                # Shared by later calls, so nothing downstream may write to it
+                codes.flags.writeable = False
+                key, arrow = cache_entry
+                self._encode_cache[key] = (arrow, codes, label_codes)
+                while len(self._encode_cache) > self._max_cached_targets:
+                    self._encode_cache.popitem(last=False)
+            return codes, label_codes
+        
+        return np.asarray(categorical.codes), LabelCodes(categorical.categories.to_numpy())
+    
+    @staticmethod
+    def _compute_k_neighbors(y: np.ndarray, cap: int = 5) -> int:
+        """SMOTE k_neighbors: at most `cap`, and below the smallest class size"""
+        if y.dtype.kind in 'iu' and y.size and y.min() >= 0 and y.max() <= y.size:
+            # Dense non-negative codes (e.g. label-encoded): one counting pass instead of a sort
+            counts = np.bincount(y)
+            min_samples = counts[counts > 0].min()
+        else:
+            min_samples = np.unique(y, return_counts=True)[1].min()
+        return max(1, min(cap, int(min_samples) - 1))
+    
+    def _neighbors(self, k_neighbors: int, n_jobs: int):
+        """Neighbour search for SMOTE (which has no n_jobs of its own) and ENN, run in parallel"""
+        # Both exclude the query point itself, hence the extra neighbour. Exact search keeps
+        # sklearn's algorithm='auto': KD-tree up to 15 features, blocked brute force above, which
+        # measured as fast as or faster than a hand-written NumPy brute-force kNN at every size.
+        if self.nn_backend == 'faiss' and FAISS_AVAILABLE:
+            return HNSWNearestNeighbors(n_neighbors=k_neighbors + 1, min_rows=self.nn_backend_threshold, n_jobs=n_jobs)
+        return NearestNeighbors(n_neighbors=k_neighbors + 1, n_jobs=n_jobs)
+    
+    def _safe_fit_resample(self, sampler, X: np.ndarray, y: np.ndarray, search_dtype: Optional[type] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Safely apply fit_resample with proper error handling; labels stay encoded
+        
+        With `search_dtype`, the sampler runs on a copy of X in that dtype and the kept rows are
+        then taken from X itself (via `sample_indices_`), so the output keeps full precision.
+        """
+        try:
+            X_search = X if search_dtype is None else self._prepare_features(X, dtype=search_dtype)
+            X_resampled, y_resampled = sampler.fit_resample(X_search, y)
+            if X_search is not X:
+                X_resampled = X[sampler.sample_indices_]
             return X_resampled, y_resampled
         except Exception as e:
             raise RuntimeError(f"Sampling failed: {str(e)}")
     
+    def _prepare_inputs(self, df: pd.DataFrame, feature_cols: List[str], target_col: str) -> Tuple[np.ndarray, np.ndarray, Optional[LabelCodes]]:
+        """Feature matrix and encoded target ready for the samplers"""
+        # All-float32 features stay float32; anything else is widened to float64.
+        all_float32 = all(df[col].dtype == np.float32 for col in feature_cols)
+        feature_dtype = np.float32 if all_float32 else np.float64
+        X_prepared = self._feature_matrix(df[feature_cols], dtype=feature_dtype)
+        y_prepared, label_encoder = self._prepare_target(df[target_col])
+        return X_prepared, y_prepared, label_encoder
+    
+    def _unavailable_method_result(self, method: str, original_dist: pd.Series) -> Optional[Dict[str, Any]]:
+        """Error result for a method this balancer cannot run, None if it can"""
+        if method in self.balancing_methods:
+            return None
+        if method in ['GAN Oversampling', 'VAE Oversampling', 'Cost-Sensitive Learning']:
+            return {
+                'success': False,
+                'error': f"{method} is not yet implemented. This advanced method requires additional dependencies.",
+                'original_distribution': original_dist
+            }
+        return {
+            'success': False,
+            'error': f"Unknown balancing method: {method}",
+            'original_distribution': original_dist
+        }
+    
+    def _already_balanced_result(
+        self,
+        df: pd.DataFrame,
+        feature_cols: List[str],
+        target_col: str,
+        method: str,
+        original_dist: pd.Series,
+        imbalance_ratio_threshold: float
+    ) -> Optional[Dict[str, Any]]:
+        """Result that leaves the data as-is when `method` would barely change it, None otherwise"""
+        if method not in RATIO_DRIVEN_METHODS or len(original_dist) < 2:
+            return None
+        ratio = original_dist.max() / original_dist.min()
+        if ratio > imbalance_ratio_threshold:
+            return None
+        return {
+            'success': True,
+            'balanced_data': df[list(dict.fromkeys(feature_cols + [target_col]))],
+            'original_distribution': original_dist,
+            'balanced_distribution': original_dist,
+            'method': method,
+            'original_size': len(df),
+            'balanced_size': len(df),
+            'skipped': True,
+            'message': f"Classes are already balanced (largest/smallest ratio {ratio:.2f}), so {method} was not applied."
+        }
+    
+    def _balanced_result(
+        self,
+        df: pd.DataFrame,
+        feature_cols: List[str],
+        target_col: str,
+        method: str,
+        X_balanced: np.ndarray,
+        y_balanced: np.ndarray,
+        label_encoder: Optional[LabelCodes],
+        original_dist: pd.Series
+    ) -> Dict[str, Any]:
+        """Wrap sampler output as the balanced frame plus before/after distributions"""
+        if label_encoder is not None:
+            # Counted while still integer codes: a bincount instead of hashing every decoded label
+            counts = np.bincount(y_balanced, minlength=len(label_encoder.classes_))
+            present = np.flatnonzero(counts)
+            balanced_dist = pd.Series(
+                counts[present], index=pd.Index(label_encoder.classes_[present], name=target_col), name='count'
+            )
+            y_balanced = label_encoder.inverse_transform(y_balanced)
+        else:
+            balanced_dist = self._class_counts(pd.Series(y_balanced, name=target_col, copy=False))
+        
+        # Built in one go from column views of X_balanced: no copy of the feature block and
+        # no column insert afterwards (the 2D constructor copies under Copy-on-Write).
+        columns = {col: X_balanced[:, i] for i, col in enumerate(feature_cols)}
+        columns[target_col] = y_balanced
+        balanced_df = pd.DataFrame(columns, copy=False)
+        
+        return {
+            'success': True,
+            'balanced_data': balanced_df,
+            'original_distribution': original_dist,
+            'balanced_distribution': balanced_dist,
+            'method': method,
+            'original_size': len(df),
+            'balanced_size': len(balanced_df),
+            'skipped': False
+        }
+    
     def balance_data(
         self, 
         df: pd.DataFrame, 
         feature_cols: List[str], 
         target_col: str, 
         method: str,
-        random_state: int = 42
+        random_state: int = 42,
+        n_jobs: int = -1,
+        imbalance_ratio_threshold: float = 1.05,
+        force: bool = False
     ) -> Dict[str, Any]:
-        """Apply balancing method to the data"""
+        """Apply balancing method to the data; n_jobs is passed to the samplers' neighbor searches
+        
+        Resampling-only methods are skipped (result flagged 'skipped') when the largest class is
+        at most imbalance_ratio_threshold times the smallest, unless force=True.
+        """
         try:
-            X = df[feature_cols].values
-            y = df[target_col].values
-            
             original_dist = self.get_class_distribution(df, target_col)
             
-            if method not in self.balancing_methods:
-                if method in ['GAN Oversampling', 'VAE Oversampling', 'Cost-Sensitive Learning']:
-                    return {
-                        'success': False,
-                        'error': f"{method} is not yet implemented. This advanced method requires additional dependencies.",
-                        'original_distribution': original_dist
-                    }
-                return {
-                    'success': False,
-                    'error': f"Unknown balancing method: {method}",
-                    'original_distribution': original_dist
-                }
+            unavailable = self._unavailable_method_result(method, original_dist)
+            if unavailable is not None:
+                return unavailable
             
-            X_prepared = self._prepare_features(X)
-            y_prepared, label_encoder, was_encoded = self._prepare_target(y)
+            if not force:
+                already_balanced = self._already_balanced_result(df, feature_cols, target_col, method, original_dist, imbalance_ratio_threshold)
+                if already_balanced is not None:
+                    return already_balanced
             
-            balancer_func = self.balancing_methods[method]
-            X_balanced, y_balanced = balancer_func(X_prepared, y_prepared, random_state, label_encoder, was_encoded)
+            X_prepared, y_prepared, label_encoder = self._prepare_inputs(df, feature_cols, target_col)
             
-            balanced_df = pd.DataFrame(X_balanced, columns=feature_cols)
-            balanced_df[target_col] = y_balanced
+            balancer_func = self.balancing_methods[method]
+            X_balanced, y_balanced = balancer_func(X_prepared, y_prepared, random_state, n_jobs)
             
-            balanced_dist = balanced_df[target_col].value_counts().sort_index()
-            
-            return {
-                'success': True,
-                'balanced_data': balanced_df,
-                'original_distribution': original_dist,
-                'balanced_distribution': balanced_dist,
-                'method': method,
-                'original_size': len(df),
-                'balanced_size': len(balanced_df)
-            }
+            return self._balanced_result(df, feature_cols, target_col, method, X_balanced, y_balanced, label_encoder, original_dist)
             
         except Exception as e:
             return {
@@ -225,105 +566,171 @@ class DataBalancer:
                 'original_distribution': self.get_class_distribution(df, target_col) if target_col in df.columns else pd.Series()
             }
     
-    def _random_oversampling(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def balance_data_batch(
+        self,
+        df: pd.DataFrame,
+        feature_cols: List[str],
+        target_col: str,
+        methods: List[str],
+        random_state: int = 42,
+        n_jobs: int = -1,
+        imbalance_ratio_threshold: float = 1.05,
+        force: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """Apply several balancing methods to the same data, one joblib worker per method
+        
+        Features and target are prepared once and shared by every method. Results are keyed
+        by method and shaped like balance_data's (skips included); a failing method does not
+        stop the others.
+        """
+        try:
+            original_dist = self.get_class_distribution(df, target_col)
+            
+            results = {}
+            runnable = []
+            for method in dict.fromkeys(methods):
+                unavailable = self._unavailable_method_result(method, original_dist)
+                if unavailable is None and not force:
+                    unavailable = self._already_balanced_result(df, feature_cols, target_col, method, original_dist, imbalance_ratio_threshold)
+                if unavailable is not None:
+                    results[method] = unavailable
+                else:
+                    runnable.append(method)
+            
+            if runnable:
+                X_prepared, y_prepared, label_encoder = self._prepare_inputs(df, feature_cols, target_col)
+                
+                if len(runnable) > 1 and n_jobs != 1:
+                    # Parallel across methods, so each sampler's own neighbor search runs single-threaded.
+                    # loky memory-maps the large X/y arrays into the workers instead of pickling copies.
+                    outcomes = Parallel(n_jobs=min(len(runnable), effective_n_jobs(n_jobs)), backend='loky')(
+                        delayed(_run_balancing_method)(self, method, X_prepared, y_prepared, random_state, 1)
+                        for method in runnable
+                    )
+                else:
+                    outcomes = [
+                        _run_balancing_method(self, method, X_prepared, y_prepared, random_state, n_jobs)
+                        for method in runnable
+                    ]
+                
+                for method, (X_balanced, y_balanced, error) in zip(runnable, outcomes):
+                    if error is not None:
+                        results[method] = {
+                            'success': False,
+                            'error': f"Error during balancing: {error}",
+                            'original_distribution': original_dist
+                        }
+                    else:
+                        results[method] = self._balanced_result(df, feature_cols, target_col, method, X_balanced, y_balanced, label_encoder, original_dist)
+            
+            return {method: results[method] for method in dict.fromkeys(methods)}
+            
+        except Exception as e:
+            original_dist = self.get_class_distribution(df, target_col) if target_col in df.columns else pd.Series()
+            return {
+                method: {
+                    'success': False,
+                    'error': f"Error during balancing: {str(e)}",
+                    'original_distribution': original_dist
+                }
+                for method in methods
+            }
+    
+    def _random_oversampling(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Random Oversampling"""
-        from imblearn.over_sampling import RandomOverSampler
-        sampler = RandomOverSampler(random_state=random_state)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['RandomOverSampler'](random_state=random_state)
+        return self._safe_fit_resample(sampler, X, y)
     
-    def _smote(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _smote(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """SMOTE (Synthetic Minority Over-sampling Technique)"""
-        from imblearn.over_sampling import SMOTE
-        unique_classes, counts = np.unique(y, return_counts=True)
-        min_samples = counts.min()
-        k_neighbors = min(5, min_samples - 1)
-        if k_neighbors < 1:
-            k_neighbors = 1
-        sampler = SMOTE(random_state=random_state, k_neighbors=k_neighbors)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
-    
-    def _random_undersampling(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+        k_neighbors = self._compute_k_neighbors(y)
+        sampler = _load_samplers()['SMOTE'](random_state=random_state, k_neighbors=self._neighbors(k_neighbors, n_jobs))
+        return self._safe_fit_resample(sampler, X, y)
+    
+    def _random_undersampling(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Random Undersampling"""
-        from imblearn.under_sampling import RandomUnderSampler
-        sampler = RandomUnderSampler(random_state=random_state)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['RandomUnderSampler'](random_state=random_state)
+        return self._safe_fit_resample(sampler, X, y)
     
-    def _tomek_links(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _tomek_links(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Tomek Links"""
-        from imblearn.under_sampling import TomekLinks
-        sampler = TomekLinks()
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['TomekLinks'](n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _nearmiss_1(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _nearmiss_1(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """NearMiss-1"""
-        from imblearn.under_sampling import NearMiss
-        sampler = NearMiss(version=1)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['NearMiss'](version=1, n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _nearmiss_2(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _nearmiss_2(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """NearMiss-2"""
-        from imblearn.under_sampling import NearMiss
-        sampler = NearMiss(version=2)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['NearMiss'](version=2, n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _nearmiss_3(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _nearmiss_3(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """NearMiss-3"""
-        from imblearn.under_sampling import NearMiss
-        sampler = NearMiss(version=3)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['NearMiss'](version=3, n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _enn(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _enn(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Edited Nearest Neighbours"""
-        from imblearn.under_sampling import EditedNearestNeighbours
-        sampler = EditedNearestNeighbours()
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['EditedNearestNeighbours'](n_neighbors=self._neighbors(3, n_jobs), n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _cnn(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _cnn(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Condensed Nearest Neighbour"""
-        from imblearn.under_sampling import CondensedNearestNeighbour
-        sampler = CondensedNearestNeighbour(random_state=random_state)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['CondensedNearestNeighbour'](random_state=random_state, n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _oss(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _oss(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """One-Sided Selection"""
-        from imblearn.under_sampling import OneSidedSelection
-        sampler = OneSidedSelection(random_state=random_state)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['OneSidedSelection'](random_state=random_state, n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _cluster_centroids(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _cluster_centroids(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Cluster Centroids"""
-        from imblearn.under_sampling import ClusterCentroids
-        sampler = ClusterCentroids(random_state=random_state)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        estimator = None
+        if len(X) >= MINIBATCH_KMEANS_MIN_ROWS:
+            estimator = MiniBatchKMeans(n_init='auto', batch_size=self.cluster_batch_size, random_state=random_state)
+        sampler = _load_samplers()['ClusterCentroids'](random_state=random_state, estimator=estimator)
+        return self._safe_fit_resample(sampler, X, y)
     
-    def _ncr(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _ncr(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """Neighbourhood Cleaning Rule"""
-        from imblearn.under_sampling import NeighbourhoodCleaningRule
-        sampler = NeighbourhoodCleaningRule()
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        sampler = _load_samplers()['NeighbourhoodCleaningRule'](n_jobs=n_jobs)
+        return self._safe_fit_resample(sampler, X, y, search_dtype=NEIGHBOR_SEARCH_DTYPE)
     
-    def _smote_tomek(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+    def _smote_tomek(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """SMOTE + Tomek Links (Hybrid)"""
-        from imblearn.combine import SMOTETomek
-        from imblearn.over_sampling import SMOTE
-        unique_classes, counts = np.unique(y, return_counts=True)
-        min_samples = counts.min()
-        k_neighbors = min(5, min_samples - 1)
-        if k_neighbors < 1:
-            k_neighbors = 1
-        smote = SMOTE(random_state=random_state, k_neighbors=k_neighbors)
-        sampler = SMOTETomek(random_state=random_state, smote=smote)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
-    
-    def _smote_enn(self, X: np.ndarray, y: np.ndarray, random_state: int, label_encoder: Optional[LabelEncoder], was_encoded: bool) -> Tuple[np.ndarray, np.ndarray]:
+        samplers = _load_samplers()
+        k_neighbors = self._compute_k_neighbors(y)
+        smote = samplers['SMOTE'](random_state=random_state, k_neighbors=self._neighbors(k_neighbors, n_jobs))
+        tomek = samplers['TomekLinks'](sampling_strategy='all', n_jobs=n_jobs)
+        sampler = samplers['SMOTETomek'](random_state=random_state, smote=smote, tomek=tomek)
+        return self._safe_fit_resample(sampler, X, y)
+    
+    def _smote_enn(self, X: np.ndarray, y: np.ndarray, random_state: int, n_jobs: int = -1) -> Tuple[np.ndarray, np.ndarray]:
         """SMOTE + ENN (Hybrid)"""
-        from imblearn.combine import SMOTEENN
-        from imblearn.over_sampling import SMOTE
-        unique_classes, counts = np.unique(y, return_counts=True)
-        min_samples = counts.min()
-        k_neighbors = min(5, min_samples - 1)
-        if k_neighbors < 1:
-            k_neighbors = 1
-        smote = SMOTE(random_state=random_state, k_neighbors=k_neighbors)
-        sampler = SMOTEENN(random_state=random_state, smote=smote)
-        return self._safe_fit_resample(sampler, X, y, label_encoder, was_encoded)
+        samplers = _load_samplers()
+        k_neighbors = self._compute_k_neighbors(y)
+        smote = samplers['SMOTE'](random_state=random_state, k_neighbors=self._neighbors(k_neighbors, n_jobs))
+        enn = samplers['EditedNearestNeighbours'](sampling_strategy='all', n_neighbors=self._neighbors(3, n_jobs), n_jobs=n_jobs)
+        sampler = samplers['SMOTEENN'](random_state=random_state, smote=smote, enn=enn)
+        return self._safe_fit_resample(sampler, X, y)
+
+
+def _run_balancing_method(
+    balancer: DataBalancer,
+    method: str,
+    X: np.ndarray,
+    y: np.ndarray,
+    random_state: int,
+    n_jobs: int
+) -> Tuple[Optional[np.ndarray], Optional[np.ndarray], Optional[str]]:
+    """One method of balance_data_batch. Errors come back as text, since a raised exception
+    would abort the whole batch."""
+    try:
+        X_balanced, y_balanced = balancer.balancing_methods[method](X, y, random_state, n_jobs)
+        return X_balanced, y_balanced, None
+    except Exception as e:
+        return None, None, str(e)
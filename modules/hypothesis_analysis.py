@@ -1,23 +1,177 @@
+import hashlib
+import math
+import os
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import combinations
+
 import pandas as pd
 import numpy as np
-from scipy import stats
-from typing import Dict, List, Any, Tuple, Optional
-import statsmodels.api as sm
-from statsmodels.stats.multicomp import pairwise_tukeyhsd
-from statsmodels.stats.proportion import proportions_ztest
-from statsmodels.formula.api import logit
+from scipy import special, stats
+from typing import Dict, List, Any, Tuple, Optional, Callable
 import warnings
 
+# Above this many observations SciPy flags Shapiro-Wilk p-values as unreliable, so normality
+# checks switch to D'Agostino's K-squared
+SHAPIRO_MAX_N = 5000
+
+# Above this many observations one_way_anova settles homogeneity of variance with the variance ratio
+# rule of thumb when it clearly holds, instead of running Levene's test
+LEVENE_MAX_N = 100_000
+
+# Below this many observations, thread start-up outweighs overlapping independent assumption checks
+PARALLEL_CHECKS_MIN_N = 50_000
+
+def _poly(coefficients: Tuple[float, ...], x: float) -> float:
+    """Polynomial with ascending coefficients, evaluated by Horner's rule"""
+    result = 0.0
+    for c in reversed(coefficients):
+        result = result * x + c
+    return result
+
+def _ppnd7(p: np.ndarray) -> np.ndarray:
+    """Normal quantiles by AS 241 PPND7, the approximation swilk uses for its coefficients"""
+    q = p - 0.5
+    r = 0.180625 - q * q
+    central = q * (((59.10937472 * r + 159.29113202) * r + 50.434271938) * r + 3.3871327179) / \
+        (((67.1875636 * r + 78.757757664) * r + 17.895169469) * r + 1.0)
+    r = np.sqrt(-np.log(np.minimum(p, 1.0 - p)))
+    near = r - 1.6
+    near = (((0.17023821103 * near + 1.3067284816) * near + 2.75681539) * near + 1.4234372777) / \
+        ((0.12021132975 * near + 0.7370016425) * near + 1.0)
+    far = r - 5.0
+    far = (((0.017337203997 * far + 0.42868294337) * far + 3.081226386) * far + 6.657905115) / \
+        ((0.012258202635 * far + 0.24197894225) * far + 1.0)
+    tail = np.copysign(np.where(r <= 5.0, near, far), q)
+    return np.where(np.abs(q) <= 0.425, central, tail)
+
+@lru_cache(maxsize=64)
+def _shapiro_coefficients(n: int) -> np.ndarray:
+    """Royston's (AS R94) Shapiro-Wilk weights for a sorted sample of size n, as the full
+    antisymmetric vector; they depend on n alone, so batches of same-sized groups share them"""
+    n2 = n // 2
+    if n == 3:
+        a = np.array([math.sqrt(0.5)])
+    else:
+        m = _ppnd7((np.arange(1, n2 + 1) - 0.375) / (n + 0.25))
+        summ2 = 2.0 * np.dot(m, m)
+        ssumm2 = math.sqrt(summ2)
+        rsn = 1.0 / math.sqrt(n)
+        a1 = _poly((0.0, 0.221157, -0.147981, -2.07119, 4.434685, -2.706056), rsn) - m[0] / ssumm2
+        if n > 5:
+            a2 = _poly((0.0, 0.042981, -0.293762, -1.752461, 5.682633, -3.582633), rsn) - m[1] / ssumm2
+            fac = math.sqrt((summ2 - 2.0 * m[0]**2 - 2.0 * m[1]**2) / (1.0 - 2.0 * a1**2 - 2.0 * a2**2))
+            a = -m / fac
+            a[1] = a2
+        else:
+            fac = math.sqrt((summ2 - 2.0 * m[0]**2) / (1.0 - 2.0 * a1**2))
+            a = -m / fac
+        a[0] = a1
+    weights = np.zeros(n)
+    weights[:n2] = -a
+    weights[n - n2:] = a[::-1]
+    weights.setflags(write=False)
+    return weights
+
+def _shapiro_wilk(values: np.ndarray) -> Tuple[float, float]:
+    """(W, p-value) of the Shapiro-Wilk test, following scipy's swilk (AS R94) on cached weights.
+    This is a double-precision port, while scipy's swilk computes in single precision, so the
+    results are close to but not identical with stats.shapiro: W agrees to about 1e-5 and the
+    p-value to about 0.02 at n=5000 (5e-3 for n up to 1000). Verdicts for p-values within that
+    margin of alpha can differ from stats.shapiro."""
+    x = np.sort(np.asarray(values, dtype=np.float64))
+    n = x.size
+    if n < 3:
+        raise ValueError('Data must be at least length 3.')
+    if np.isnan(x[-1]):
+        return np.nan, np.nan
+    x = x - x[n // 2]
+    data_range = x[-1] - x[0]
+    if data_range < 1e-19:
+        # stats.shapiro reports constant data as (1, 1), with a warning
+        return 1.0, 1.0
+    
+    # W is the squared correlation between the sorted sample and the weights
+    weights = _shapiro_coefficients(n)
+    x = x / data_range
+    x -= x.mean()
+    ssa = np.dot(weights, weights)
+    ssx = np.dot(x, x)
+    sax = np.dot(weights, x)
+    ssassx = math.sqrt(ssa * ssx)
+    w1 = (ssassx - sax) * (ssassx + sax) / (ssa * ssx)
+    w = 1.0 - w1
+    
+    if n == 3:
+        p_value = 1.90985931710274 * (math.asin(math.sqrt(w)) - 1.04719755119660)
+        return w, max(p_value, 0.0)
+    
+    # Royston's normalizing transform of log(1 - W)
+    y = math.log(w1)
+    if n <= 11:
+        gamma = _poly((-2.273, 0.459), n)
+        if y >= gamma:
+            return w, 1e-99
+        y = -math.log(gamma - y)
+        mean = _poly((0.544, -0.39978, 0.025054, -6.714e-4), n)
+        std = math.exp(_poly((1.3822, -0.77857, 0.062767, -0.0020322), n))
+    else:
+        log_n = math.log(n)
+        mean = _poly((-1.5861, -0.31082, -0.083751, 0.0038915), log_n)
+        std = math.exp(_poly((-0.4803, -0.082676, 0.0030302), log_n))
+    return w, float(special.ndtr((mean - y) / std))
+
+# One recommend_test entry; the fixed ones below are shared rather than rebuilt per call
+Recommendation = namedtuple('Recommendation', ['test', 'reason', 'priority'])
+
+_REC_ONE_SAMPLE_TTEST = Recommendation('one_sample_ttest', 'Test if the mean differs from a specific value', 'medium')
+_REC_PEARSON = Recommendation('pearson_correlation', 'Both variables are normally distributed - Pearson correlation recommended', 'high')
+_REC_SPEARMAN = Recommendation('spearman_correlation', 'Non-normal distribution detected - Spearman correlation recommended', 'high')
+_REC_LINEAR_REGRESSION = Recommendation('simple_linear_regression', 'Explore linear relationship between variables', 'medium')
+_REC_MANN_WHITNEY = Recommendation('mann_whitney', 'Non-normal distribution - Mann-Whitney U test recommended', 'high')
+_REC_WELCH_TTEST = Recommendation('welch_ttest', 'Two groups with numeric outcome - Welch\'s t-test recommended (robust to unequal variances)', 'high')
+_REC_INDEPENDENT_TTEST = Recommendation('independent_ttest', 'Alternative: Independent t-test (assumes equal variances)', 'medium')
+_REC_KRUSKAL_WALLIS = Recommendation('kruskal_wallis', 'Non-parametric alternative to ANOVA', 'medium')
+_REC_CHI_SQUARE = Recommendation('chi_square', 'Two categorical variables - Chi-square test for independence', 'high')
+_REC_FISHER_EXACT = Recommendation('fisher_exact', 'Small cell counts - Fisher\'s exact test recommended', 'high')
+
 class HypothesisAnalyzer:
     """Comprehensive hypothesis testing and statistical analysis module"""
     
-    def __init__(self):
+    def __init__(self, max_cached_normality: int = 256, max_cached_ranks: int = 32,
+                 max_cached_crosstabs: int = 32, max_workers: Optional[int] = None):
         self.alpha = 0.05  # Default significance level
+        # Threads for independent assumption checks on large samples (defaults to the CPU count)
+        self.max_workers = max_workers
+        # (dtype, length, content hash, alpha) -> normality verdict. recommend_test and the tests
+        # it leads to check the same columns and groups again, so each is tested once.
+        self.normality_cache: "OrderedDict[Tuple[str, int, str, float], bool]" = OrderedDict()
+        self.max_cached_normality = max_cached_normality
+        # (column, length, content hash) -> average ranks, so sweeping Spearman pairs against one
+        # reference column ranks it once
+        self._rank_cache: "OrderedDict[Tuple[str, str, int, str], np.ndarray]" = OrderedDict()
+        self.max_cached_ranks = max_cached_ranks
+        # Column pair identity -> (pinned Arrow arrays, contingency table), shared by recommend_test's
+        # small-cell check and the chi-square/Fisher/McNemar tests on the same pair. Entries keep the
+        # columns alive, so pass 0 to disable it when frames are rebuilt per call (e.g. unpickled)
+        self._crosstab_cache: "OrderedDict[tuple, Tuple[tuple, pd.DataFrame]]" = OrderedDict()
+        self.max_cached_crosstabs = max_cached_crosstabs
+        self._cache_lock = threading.Lock()
         
     def set_alpha(self, alpha: float):
         """Set significance level"""
         self.alpha = alpha
     
+    # Sorted column types -> recommend_test handler; other combinations get no recommendation
+    _RECOMMENDERS = {
+        ('numeric',): '_recommend_numeric',
+        ('numeric', 'numeric'): '_recommend_numeric_pair',
+        ('categorical', 'numeric'): '_recommend_numeric_by_group',
+        ('categorical', 'categorical'): '_recommend_categorical_pair',
+    }
+    
     def recommend_test(self, df: pd.DataFrame, columns: List[str], data_types: Dict[str, str]) -> Dict[str, Any]:
         """Intelligently recommend the most suitable hypothesis test"""
         
@@ -27,107 +181,59 @@ class HypothesisAnalyzer:
         # Determine column types
         col_types = [data_types.get(col, self._infer_type(df[col])) for col in columns]
         
-        recommendations = []
-        
-        if len(columns) == 1:
-            col_type = col_types[0]
-            if col_type == 'numeric':
-                recommendations.append({
-                    'test': 'one_sample_ttest',
-                    'reason': 'Test if the mean differs from a specific value',
-                    'priority': 'medium'
-                })
-        
-        elif len(columns) == 2:
-            # Two numeric columns
-            if all(ct == 'numeric' for ct in col_types):
-                # Check normality
-                normality_checks = [self._check_normality(df[col]) for col in columns]
-                
-                if all(normality_checks):
-                    recommendations.append({
-                        'test': 'pearson_correlation',
-                        'reason': 'Both variables are normally distributed - Pearson correlation recommended',
-                        'priority': 'high'
-                    })
-                else:
-                    recommendations.append({
-                        'test': 'spearman_correlation',
-                        'reason': 'Non-normal distribution detected - Spearman correlation recommended',
-                        'priority': 'high'
-                    })
-                
-                recommendations.append({
-                    'test': 'simple_linear_regression',
-                    'reason': 'Explore linear relationship between variables',
-                    'priority': 'medium'
-                })
-            
-            # One numeric, one categorical
-            elif 'numeric' in col_types and 'categorical' in col_types:
-                num_col = columns[col_types.index('numeric')]
-                cat_col = columns[col_types.index('categorical')]
-                
-                unique_categories = df[cat_col].nunique()
-                
-                if unique_categories == 2:
-                    # Check normality and equal variance
-                    groups = [df[df[cat_col] == cat][num_col].dropna() for cat in df[cat_col].unique()[:2]]
-                    normality = all(self._check_normality(g) for g in groups if len(g) > 2)
-                    
-                    if not normality:
-                        recommendations.append({
-                            'test': 'mann_whitney',
-                            'reason': 'Non-normal distribution - Mann-Whitney U test recommended',
-                            'priority': 'high'
-                        })
-                    else:
-                        recommendations.append({
-                            'test': 'welch_ttest',
-                            'reason': 'Two groups with numeric outcome - Welch\'s t-test recommended (robust to unequal variances)',
-                            'priority': 'high'
-                        })
-                        recommendations.append({
-                            'test': 'independent_ttest',
-                            'reason': 'Alternative: Independent t-test (assumes equal variances)',
-                            'priority': 'medium'
-                        })
-                
-                elif unique_categories > 2:
-                    recommendations.append({
-                        'test': 'one_way_anova',
-                        'reason': f'{unique_categories} groups - One-way ANOVA to compare means',
-                        'priority': 'high'
-                    })
-                    recommendations.append({
-                        'test': 'kruskal_wallis',
-                        'reason': 'Non-parametric alternative to ANOVA',
-                        'priority': 'medium'
-                    })
-            
-            # Two categorical columns
-            elif all(ct == 'categorical' for ct in col_types):
-                recommendations.append({
-                    'test': 'chi_square',
-                    'reason': 'Two categorical variables - Chi-square test for independence',
-                    'priority': 'high'
-                })
-                
-                # Check if suitable for Fisher's exact test
-                contingency = pd.crosstab(df[columns[0]], df[columns[1]])
-                if contingency.size <= 20 and contingency.min().min() < 5:
-                    recommendations.append({
-                        'test': 'fisher_exact',
-                        'reason': 'Small cell counts - Fisher\'s exact test recommended',
-                        'priority': 'high'
-                    })
+        handler = self._RECOMMENDERS.get(tuple(sorted(col_types)))
+        recommendations = getattr(self, handler)(df, columns, col_types) if handler else []
         
         return {
-            'recommendations': recommendations,
+            'recommendations': [r._asdict() for r in recommendations],
             'column_types': dict(zip(columns, col_types)),
             'alpha': self.alpha
         }
     
+    def _recommend_numeric(self, df: pd.DataFrame, columns: List[str], col_types: List[str]) -> List[Recommendation]:
+        """One numeric column"""
+        return [_REC_ONE_SAMPLE_TTEST]
+    
+    def _recommend_numeric_pair(self, df: pd.DataFrame, columns: List[str], col_types: List[str]) -> List[Recommendation]:
+        """Two numeric columns"""
+        # Check normality
+        normality_checks = [self._recommend_normality(df[col]) for col in columns]
+        correlation = _REC_PEARSON if all(normality_checks) else _REC_SPEARMAN
+        return [correlation, _REC_LINEAR_REGRESSION]
+    
+    def _recommend_numeric_by_group(self, df: pd.DataFrame, columns: List[str], col_types: List[str]) -> List[Recommendation]:
+        """One numeric, one categorical column"""
+        num_col = columns[col_types.index('numeric')]
+        cat_col = columns[col_types.index('categorical')]
+        
+        unique_categories = df[cat_col].nunique()
+        
+        if unique_categories == 2:
+            # Check normality and equal variance
+            groups = list(self._split_groups(df, num_col, cat_col).values())[:2]
+            normality = all(self._recommend_normality(g) for g in groups if len(g) > 2)
+            
+            if not normality:
+                return [_REC_MANN_WHITNEY]
+            return [_REC_WELCH_TTEST, _REC_INDEPENDENT_TTEST]
+        
+        if unique_categories > 2:
+            return [
+                Recommendation('one_way_anova', f'{unique_categories} groups - One-way ANOVA to compare means', 'high'),
+                _REC_KRUSKAL_WALLIS
+            ]
+        return []
+    
+    def _recommend_categorical_pair(self, df: pd.DataFrame, columns: List[str], col_types: List[str]) -> List[Recommendation]:
+        """Two categorical columns"""
+        recommendations = [_REC_CHI_SQUARE]
+        
+        # Check if suitable for Fisher's exact test
+        contingency = self._crosstab(df, columns[0], columns[1])
+        if contingency.size <= 20 and contingency.min().min() < 5:
+            recommendations.append(_REC_FISHER_EXACT)
+        return recommendations
+    
     def one_sample_ttest(self, df: pd.DataFrame, column: str, test_value: float = 0) -> Dict[str, Any]:
         """One-sample t-test"""
         try:
@@ -165,7 +271,7 @@ class HypothesisAnalyzer:
                 'sample_sizes': {'n': len(data)},
                 'sample_mean': float(data.mean()),
                 'test_value': float(test_value),
-                'missing_count': df[column].isna().sum(),
+                'missing_count': len(df) - len(data),
                 'assumption_checks': assumptions,
                 'visualizations': ['histogram', 'box_plot'],
                 'interpretation': f"The sample mean ({data.mean():.3f}) {'differs significantly' if p_value < self.alpha else 'does not differ significantly'} from {test_value} (p = {p_value:.4f})",
@@ -177,9 +283,12 @@ class HypothesisAnalyzer:
     def welch_ttest(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Welch's t-test (doesn't assume equal variances)"""
         try:
-            groups = df[group_col].dropna().unique()[:2]
-            group1 = df[df[group_col] == groups[0]][numeric_col].dropna()
-            group2 = df[df[group_col] == groups[1]][numeric_col].dropna()
+            group_values = self._split_groups(df, numeric_col, group_col)
+            if len(group_values) < 2:
+                return {'error': 'Need at least 2 groups'}
+            groups = list(group_values)[:2]
+            group1 = group_values[groups[0]]
+            group2 = group_values[groups[1]]
             
             if len(group1) < 2 or len(group2) < 2:
                 return {'error': 'Insufficient data in one or both groups'}
@@ -187,17 +296,29 @@ class HypothesisAnalyzer:
             # Perform Welch's t-test
             statistic, p_value = stats.ttest_ind(group1, group2, equal_var=False)
             
+            # Group moments, computed once on the raw arrays and reused below
+            values1, values2 = group1.to_numpy(), group2.to_numpy()
+            n1, n2 = values1.size, values2.size
+            mean1, mean2 = values1.mean(), values2.mean()
+            var1, var2 = values1.var(ddof=1), values2.var(ddof=1)
+            std1, std2 = np.sqrt(var1), np.sqrt(var2)
+            v1n1, v2n2 = var1 / n1, var2 / n2
+            mean_diff = mean1 - mean2
+            
             # Calculate effect size (Cohen's d)
-            pooled_std = np.sqrt((group1.std()**2 + group2.std()**2) / 2)
-            cohens_d = (group1.mean() - group2.mean()) / pooled_std if pooled_std > 0 else 0
+            pooled_std = np.sqrt((var1 + var2) / 2)
+            cohens_d = mean_diff / pooled_std if pooled_std > 0 else 0
             
             # Calculate confidence interval
-            se_diff = np.sqrt(group1.var()/len(group1) + group2.var()/len(group2))
-            df_welch = (group1.var()/len(group1) + group2.var()/len(group2))**2 / \
-                       ((group1.var()/len(group1))**2/(len(group1)-1) + (group2.var()/len(group2))**2/(len(group2)-1))
+            # Welch-Satterthwaite df from each group's share of the squared standard error: the
+            # shares are scale-free, so tiny or huge variances neither underflow nor overflow
+            se2 = v1n1 + v2n2
+            se_diff = np.sqrt(se2)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                w1, w2 = v1n1 / se2, v2n2 / se2
+                df_welch = 1.0 / (w1*w1/(n1-1) + w2*w2/(n2-1))
             t_crit = stats.t.ppf(1 - self.alpha/2, df_welch)
-            ci = ((group1.mean() - group2.mean()) - t_crit * se_diff,
-                  (group1.mean() - group2.mean()) + t_crit * se_diff)
+            ci = (mean_diff - t_crit * se_diff, mean_diff + t_crit * se_diff)
             
             # Assumption checks
             assumptions = {
@@ -217,10 +338,10 @@ class HypothesisAnalyzer:
                 'decision': 'Reject H0' if p_value < self.alpha else 'Fail to reject H0',
                 'sample_sizes': {'group1': len(group1), 'group2': len(group2)},
                 'group_stats': {
-                    str(groups[0]): {'mean': float(group1.mean()), 'std': float(group1.std()), 'n': len(group1)},
-                    str(groups[1]): {'mean': float(group2.mean()), 'std': float(group2.std()), 'n': len(group2)}
+                    str(groups[0]): {'mean': float(mean1), 'std': float(std1), 'n': n1},
+                    str(groups[1]): {'mean': float(mean2), 'std': float(std2), 'n': n2}
                 },
-                'missing_count': df[numeric_col].isna().sum(),
+                'missing_count': len(df) - int(df[numeric_col].count()),
                 'assumption_checks': assumptions,
                 'visualizations': ['box_plot', 'violin_plot'],
                 'interpretation': self._interpret_ttest(p_value, cohens_d, groups[0], groups[1]),
@@ -232,9 +353,12 @@ class HypothesisAnalyzer:
     def mann_whitney(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Mann-Whitney U test (non-parametric alternative to t-test)"""
         try:
-            groups = df[group_col].dropna().unique()[:2]
-            group1 = df[df[group_col] == groups[0]][numeric_col].dropna()
-            group2 = df[df[group_col] == groups[1]][numeric_col].dropna()
+            group_values = self._split_groups(df, numeric_col, group_col)
+            if len(group_values) < 2:
+                return {'error': 'Need at least 2 groups'}
+            groups = list(group_values)[:2]
+            group1 = group_values[groups[0]]
+            group2 = group_values[groups[1]]
             
             if len(group1) < 2 or len(group2) < 2:
                 return {'error': 'Insufficient data in one or both groups'}
@@ -245,6 +369,11 @@ class HypothesisAnalyzer:
             # Calculate effect size (rank-biserial correlation)
             r = 1 - (2*statistic) / (len(group1) * len(group2))
             
+            # Mean ranks within the pooled sample, as the U statistic uses them
+            joint_ranks = stats.rankdata(np.concatenate([group1.to_numpy(), group2.to_numpy()]))
+            mean_rank1 = joint_ranks[:len(group1)].mean()
+            mean_rank2 = joint_ranks[len(group1):].mean()
+            
             return {
                 'test_name': 'Mann-Whitney U test',
                 'statistic': float(statistic),
@@ -256,10 +385,10 @@ class HypothesisAnalyzer:
                 'decision': 'Reject H0' if p_value < self.alpha else 'Fail to reject H0',
                 'sample_sizes': {'group1': len(group1), 'group2': len(group2)},
                 'group_stats': {
-                    str(groups[0]): {'median': float(group1.median()), 'mean_rank': float(group1.rank().mean()), 'n': len(group1)},
-                    str(groups[1]): {'median': float(group2.median()), 'mean_rank': float(group2.rank().mean()), 'n': len(group2)}
+                    str(groups[0]): {'median': float(group1.median()), 'mean_rank': float(mean_rank1), 'n': len(group1)},
+                    str(groups[1]): {'median': float(group2.median()), 'mean_rank': float(mean_rank2), 'n': len(group2)}
                 },
-                'missing_count': df[numeric_col].isna().sum(),
+                'missing_count': len(df) - int(df[numeric_col].count()),
                 'assumption_checks': {'independence': 'Assumed', 'ordinal_or_continuous': 'Yes'},
                 'visualizations': ['box_plot', 'violin_plot'],
                 'notes': 'Non-parametric test - does not assume normal distribution',
@@ -279,14 +408,12 @@ class HypothesisAnalyzer:
                 return {'error': 'Insufficient data for correlation'}
             
             # Calculate Pearson correlation
-            r, p_value = stats.pearsonr(valid_data[col1], valid_data[col2])
+            res = stats.pearsonr(valid_data[col1], valid_data[col2])
+            r, p_value = res.statistic, res.pvalue
             
-            # Calculate confidence interval
-            z = np.arctanh(r)
-            se = 1/np.sqrt(len(valid_data)-3)
-            z_crit = stats.norm.ppf(1 - self.alpha/2)
-            ci_z = (z - z_crit*se, z + z_crit*se)
-            ci = (np.tanh(ci_z[0]), np.tanh(ci_z[1]))
+            # Fisher-z confidence interval
+            ci_res = res.confidence_interval(confidence_level=1 - self.alpha)
+            ci = (float(ci_res.low), float(ci_res.high))
             
             # R-squared
             r_squared = r**2
@@ -327,8 +454,15 @@ class HypothesisAnalyzer:
             if len(valid_data) < 3:
                 return {'error': 'Insufficient data for correlation'}
             
-            # Calculate Spearman correlation
-            rho, p_value = stats.spearmanr(valid_data[col1], valid_data[col2])
+            # Spearman rho is Pearson r on the ranks; the p-value uses the same t approximation
+            # as stats.spearmanr
+            n = len(valid_data)
+            r1 = self._ranks(col1, valid_data[col1])
+            r2 = self._ranks(col2, valid_data[col2])
+            rho = np.corrcoef(r1, r2)[0, 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                t = rho * np.sqrt((n - 2) / ((1.0 - rho) * (1.0 + rho)))
+            p_value = 2 * stats.t.sf(np.abs(t), n - 2)
             
             return {
                 'test_name': 'Spearman Correlation',
@@ -353,15 +487,17 @@ class HypothesisAnalyzer:
     def chi_square(self, df: pd.DataFrame, col1: str, col2: str) -> Dict[str, Any]:
         """Chi-square test of independence"""
         try:
-            # Create contingency table
-            contingency = pd.crosstab(df[col1], df[col2])
+            # Create contingency table; the arithmetic below runs on its NumPy counts. The table
+            # already excludes rows missing either value, so missing_count is len(df) minus its total.
+            contingency = self._crosstab(df, col1, col2)
+            observed = contingency.to_numpy()
             
             # Perform chi-square test
-            chi2, p_value, dof, expected = stats.chi2_contingency(contingency)
+            chi2, p_value, dof, expected = stats.chi2_contingency(observed)
             
             # Calculate effect size (Cramér's V)
-            n = contingency.sum().sum()
-            min_dim = min(contingency.shape[0], contingency.shape[1])
+            n = observed.sum()
+            min_dim = min(observed.shape)
             cramers_v = np.sqrt(chi2 / (n * (min_dim - 1)))
             
             # Check assumptions
@@ -384,14 +520,17 @@ class HypothesisAnalyzer:
                 'alpha': self.alpha,
                 'decision': 'Variables are associated' if p_value < self.alpha else 'No significant association',
                 'sample_sizes': {'n': int(n)},
-                'missing_count': df[[col1, col2]].isna().any(axis=1).sum(),
+                'missing_count': len(df) - int(n),
                 'assumption_checks': {
                     'min_expected_frequency': float(min_expected),
                     'cells_below_5': int(cells_below_5),
                     'independence': 'Assumed'
                 },
                 'contingency_table': contingency.to_dict(),
-                'expected_frequencies': pd.DataFrame(expected, index=contingency.index, columns=contingency.columns).to_dict(),
+                'expected_frequencies': {
+                    col: dict(zip(contingency.index.tolist(), expected[:, j].tolist()))
+                    for j, col in enumerate(contingency.columns.tolist())
+                },
                 'visualizations': ['heatmap', 'grouped_bar'],
                 'interpretation': f"The variables {col1} and {col2} {'are significantly associated' if p_value < self.alpha else 'are independent'} (χ² = {chi2:.2f}, p = {p_value:.4f})",
                 'warnings': warnings_list
@@ -402,15 +541,16 @@ class HypothesisAnalyzer:
     def fisher_exact(self, df: pd.DataFrame, col1: str, col2: str) -> Dict[str, Any]:
         """Fisher's exact test (for 2x2 tables)"""
         try:
-            # Create contingency table
-            contingency = pd.crosstab(df[col1], df[col2])
+            # Create contingency table (rows missing either value are excluded, as in chi_square)
+            contingency = self._crosstab(df, col1, col2)
+            observed = contingency.to_numpy()
             
             # Check if 2x2
-            if contingency.shape != (2, 2):
+            if observed.shape != (2, 2):
                 return {'error': 'Fisher\'s exact test requires a 2x2 contingency table'}
             
             # Perform Fisher's exact test
-            oddsratio, p_value = stats.fisher_exact(contingency)
+            oddsratio, p_value = stats.fisher_exact(observed)
             
             return {
                 'test_name': "Fisher's exact test",
@@ -421,8 +561,8 @@ class HypothesisAnalyzer:
                 'confidence_interval': {'level': 'N/A', 'interval': 'N/A'},
                 'alpha': self.alpha,
                 'decision': 'Variables are associated' if p_value < self.alpha else 'No significant association',
-                'sample_sizes': {'n': int(contingency.sum().sum())},
-                'missing_count': df[[col1, col2]].isna().any(axis=1).sum(),
+                'sample_sizes': {'n': int(observed.sum())},
+                'missing_count': len(df) - int(observed.sum()),
                 'assumption_checks': {'independence': 'Assumed'},
                 'contingency_table': contingency.to_dict(),
                 'visualizations': ['grouped_bar'],
@@ -433,13 +573,13 @@ class HypothesisAnalyzer:
         except Exception as e:
             return {'error': str(e)}
     
-    def one_way_anova(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
-        """One-way ANOVA"""
+    def one_way_anova(self, df: pd.DataFrame, numeric_col: str, group_col: str,
+                      check_homogeneity: bool = True) -> Dict[str, Any]:
+        """One-way ANOVA; check_homogeneity=False skips the variance-homogeneity check"""
         try:
             # Get groups
-            valid_categories = df[group_col].dropna().unique()
-            groups = [df[df[group_col] == cat][numeric_col].dropna() for cat in valid_categories]
-            groups = [g for g in groups if len(g) > 0]
+            group_values = self._split_groups(df, numeric_col, group_col)
+            groups = [g for g in group_values.values() if len(g) > 0]
             
             if len(groups) < 2:
                 return {'error': 'Need at least 2 groups for ANOVA'}
@@ -447,26 +587,29 @@ class HypothesisAnalyzer:
             # Perform ANOVA
             f_stat, p_value = stats.f_oneway(*groups)
             
-            # Calculate effect size (eta-squared)
-            grand_mean = df[numeric_col].mean()
-            ss_between = sum(len(g) * (g.mean() - grand_mean)**2 for g in groups)
-            ss_total = sum((df[numeric_col] - grand_mean)**2)
+            # Per-group (n, mean, std), one NumPy pass each, shared by eta-squared, the homogeneity
+            # check and group_stats
+            labels = [str(cat) for cat in group_values]
+            moments = np.array([self._group_moments(g) for g in group_values.values()], dtype=float)
+            counts, means, stds = moments[moments[:, 0] > 0].T
+            
+            # Calculate effect size (eta-squared) with NumPy reductions over the non-missing values
+            values = self._valid_values(df[numeric_col])
+            grand_mean = values.mean()
+            ss_between = float(np.dot(counts, (means - grand_mean)**2))
+            ss_total = float(values.var() * len(values))
             eta_squared = ss_between / ss_total if ss_total > 0 else 0
             
             # Degrees of freedom
             df_between = len(groups) - 1
-            df_within = len(df[numeric_col].dropna()) - len(groups)
+            df_within = len(values) - len(groups)
             
             # Assumption checks
             normality_checks = {f'group_{i}': self._check_normality(g) for i, g in enumerate(groups) if len(g) > 2}
             
-            # Levene's test for homogeneity of variances
-            levene_stat, levene_p = stats.levene(*groups)
-            
-            assumptions = {
-                'normality_per_group': normality_checks,
-                'homogeneity_of_variance': {'statistic': float(levene_stat), 'p_value': float(levene_p), 'passed': levene_p > 0.05}
-            }
+            assumptions = {'normality_per_group': normality_checks}
+            if check_homogeneity:
+                assumptions['homogeneity_of_variance'] = self._anova_homogeneity(groups, len(values), stds**2)
             
             return {
                 'test_name': 'One-way ANOVA',
@@ -477,15 +620,12 @@ class HypothesisAnalyzer:
                 'confidence_interval': {'level': 'N/A', 'interval': 'N/A'},
                 'alpha': self.alpha,
                 'decision': 'At least one group mean differs' if p_value < self.alpha else 'No significant difference',
-                'sample_sizes': {str(cat): len(df[df[group_col] == cat][numeric_col].dropna()) for cat in valid_categories},
-                'missing_count': df[numeric_col].isna().sum(),
+                'sample_sizes': dict(zip(labels, moments[:, 0].astype(int).tolist())),
+                'missing_count': len(df) - len(values),
                 'assumption_checks': assumptions,
                 'group_stats': {
-                    str(cat): {
-                        'mean': float(df[df[group_col] == cat][numeric_col].mean()),
-                        'std': float(df[df[group_col] == cat][numeric_col].std()),
-                        'n': len(df[df[group_col] == cat][numeric_col].dropna())
-                    } for cat in valid_categories
+                    label: {'mean': mean, 'std': std, 'n': int(n)}
+                    for label, (n, mean, std) in zip(labels, moments.tolist())
                 },
                 'visualizations': ['box_plot', 'violin_plot'],
                 'interpretation': f"{'At least one group mean differs significantly' if p_value < self.alpha else 'No significant differences'} across groups (F = {f_stat:.2f}, p = {p_value:.4f})",
@@ -495,13 +635,27 @@ class HypothesisAnalyzer:
         except Exception as e:
             return {'error': str(e)}
     
+    def _anova_homogeneity(self, groups: List[pd.Series], n_total: int, variances: np.ndarray) -> Dict[str, Any]:
+        """Levene's test for homogeneity of variances. On large samples, where Levene costs another
+        full pass and flags negligible differences, a largest/smallest variance ratio under 2 is
+        taken as passing without running it."""
+        if n_total > LEVENE_MAX_N:
+            variances = variances[~np.isnan(variances)]
+            if variances.size > 1 and variances.min() > 0:
+                variance_ratio = variances.max() / variances.min()
+                if variance_ratio < 2:
+                    return {'variance_ratio': float(variance_ratio), 'passed': True,
+                            'method': 'Variance ratio < 2 (Levene skipped)'}
+        
+        levene_stat, levene_p = stats.levene(*groups)
+        return {'statistic': float(levene_stat), 'p_value': float(levene_p), 'passed': levene_p > 0.05}
+    
     def kruskal_wallis(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Kruskal-Wallis H test (non-parametric alternative to ANOVA)"""
         try:
             # Get groups
-            valid_categories = df[group_col].dropna().unique()
-            groups = [df[df[group_col] == cat][numeric_col].dropna() for cat in valid_categories]
-            groups = [g for g in groups if len(g) > 0]
+            group_values = self._split_groups(df, numeric_col, group_col)
+            groups = [g for g in group_values.values() if len(g) > 0]
             
             if len(groups) < 2:
                 return {'error': 'Need at least 2 groups for Kruskal-Wallis test'}
@@ -510,10 +664,17 @@ class HypothesisAnalyzer:
             h_stat, p_value = stats.kruskal(*groups)
             
             # Calculate effect size (epsilon-squared)
-            n = len(df[numeric_col].dropna())
+            n = int(df[numeric_col].count())
             k = len(groups)
             epsilon_squared = (h_stat - k + 1) / (n - k) if (n - k) > 0 else 0
             
+            # Mean ranks within the pooled sample, as H uses them, from one ranking of all groups
+            sizes = np.array([len(g) for g in group_values.values()])
+            pooled_ranks = stats.rankdata(np.concatenate([g.to_numpy(dtype=np.float64) for g in group_values.values()]))
+            rank_sums = np.bincount(np.repeat(np.arange(sizes.size), sizes), weights=pooled_ranks, minlength=sizes.size)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                mean_ranks = (rank_sums / sizes).tolist()
+            
             return {
                 'test_name': 'Kruskal-Wallis H test',
                 'statistic': float(h_stat),
@@ -523,15 +684,12 @@ class HypothesisAnalyzer:
                 'confidence_interval': {'level': 'N/A', 'interval': 'N/A'},
                 'alpha': self.alpha,
                 'decision': 'At least one group distribution differs' if p_value < self.alpha else 'No significant difference',
-                'sample_sizes': {str(cat): len(df[df[group_col] == cat][numeric_col].dropna()) for cat in valid_categories},
-                'missing_count': df[numeric_col].isna().sum(),
+                'sample_sizes': {str(cat): len(g) for cat, g in group_values.items()},
+                'missing_count': len(df) - n,
                 'assumption_checks': {'independence': 'Assumed', 'ordinal_or_continuous': 'Yes'},
                 'group_stats': {
-                    str(cat): {
-                        'median': float(df[df[group_col] == cat][numeric_col].median()),
-                        'mean_rank': float(df[df[group_col] == cat][numeric_col].rank().mean()),
-                        'n': len(df[df[group_col] == cat][numeric_col].dropna())
-                    } for cat in valid_categories
+                    str(cat): {'median': float(g.median()), 'mean_rank': mean_rank, 'n': len(g)}
+                    for (cat, g), mean_rank in zip(group_values.items(), mean_ranks)
                 },
                 'visualizations': ['box_plot', 'violin_plot'],
                 'notes': 'Non-parametric test - does not assume normal distribution',
@@ -551,21 +709,22 @@ class HypothesisAnalyzer:
                 return {'error': 'Insufficient data for Tukey HSD'}
             
             # Perform Tukey HSD
+            from statsmodels.stats.multicomp import pairwise_tukeyhsd
             tukey_result = pairwise_tukeyhsd(valid_data[numeric_col], valid_data[group_col], alpha=self.alpha)
             
-            # Parse results
-            comparisons = []
-            for i in range(len(tukey_result.groupsunique)):
-                for j in range(i+1, len(tukey_result.groupsunique)):
-                    idx = i * (len(tukey_result.groupsunique) - 1) + j - 1 if i < j else None
-                    if idx is not None and idx < len(tukey_result.reject):
-                        comparisons.append({
-                            'group1': str(tukey_result.groupsunique[i]),
-                            'group2': str(tukey_result.groupsunique[j]),
-                            'mean_diff': float(tukey_result.meandiffs[idx] if idx < len(tukey_result.meandiffs) else 0),
-                            'reject': bool(tukey_result.reject[idx]),
-                            'significant': 'Yes' if tukey_result.reject[idx] else 'No'
-                        })
+            # Parse results: statsmodels orders its flat result arrays like combinations(groupsunique, 2)
+            pairs = combinations(tukey_result.groupsunique, 2)
+            comparisons = [
+                {
+                    'group1': str(a),
+                    'group2': str(b),
+                    'mean_diff': float(md),
+                    'reject': bool(rj),
+                    'p_value': float(pv),
+                    'significant': 'Yes' if rj else 'No'
+                }
+                for (a, b), md, rj, pv in zip(pairs, tukey_result.meandiffs, tukey_result.reject, tukey_result.pvalues)
+            ]
             
             return {
                 'test_name': "Tukey's HSD post-hoc test",
@@ -594,6 +753,7 @@ class HypothesisAnalyzer:
                 return {'error': 'Need exactly 2 proportions to compare'}
             
             # Perform test
+            from statsmodels.stats.proportion import proportions_ztest
             z_stat, p_value = proportions_ztest(successes, totals)
             
             # Calculate proportions
@@ -691,6 +851,7 @@ class HypothesisAnalyzer:
                 return {'error': 'Insufficient data for regression'}
             
             # Prepare data
+            import statsmodels.api as sm
             X = sm.add_constant(valid_data[x_col])
             y = valid_data[y_col]
             
@@ -706,15 +867,19 @@ class HypothesisAnalyzer:
             normality = self._check_normality(residuals)
             
             # Homoscedasticity (constant variance)
-            # Using Breusch-Pagan test
-            from statsmodels.stats.diagnostic import het_breuschpagan
-            bp_test = het_breuschpagan(residuals, X)
-            homoscedasticity = bp_test[1] > 0.05  # p-value > 0.05 means homoscedastic
+            # Using Breusch-Pagan test (Koenker's LM = n * R^2, as het_breuschpagan computes it). With
+            # a single regressor the auxiliary regression of e^2 on [1, x] has R^2 = corr(e^2, x)^2,
+            # so no second OLS fit is needed.
+            squared_resid = residuals.to_numpy()**2
+            with np.errstate(divide='ignore', invalid='ignore'):
+                aux_r = np.corrcoef(squared_resid, valid_data[x_col].to_numpy(dtype=np.float64))[0, 1]
+            bp_p_value = special.chdtrc(1, len(squared_resid) * aux_r**2)
+            homoscedasticity = bp_p_value > 0.05  # p-value > 0.05 means homoscedastic
             
             assumptions = {
                 'linearity': 'Visual inspection recommended',
                 'normality_of_residuals': normality,
-                'homoscedasticity': {'passed': homoscedasticity, 'p_value': float(bp_test[1])},
+                'homoscedasticity': {'passed': homoscedasticity, 'p_value': float(bp_p_value)},
                 'independence': 'Assumed'
             }
             
@@ -762,25 +927,30 @@ class HypothesisAnalyzer:
                 return {'error': 'Insufficient data for logistic regression'}
             
             # Prepare data
+            import statsmodels.api as sm
             X = sm.add_constant(valid_data[x_col])
             y = valid_data[y_col]
             
-            # Encode y if necessary
-            if y.dtype == 'object':
-                y_values = sorted(y.unique())
-                y = (y == y_values[1]).astype(int)
+            # Encode y as 0/1 (the larger of the two values is the event), whatever its labels
+            y_values = sorted(y.unique())
+            y = (y == y_values[1]).astype(int)
             
             # Fit model
-            model = logit(y, X).fit(disp=False)
+            model = sm.Logit(y, X).fit(disp=False)
             
-            # Calculate pseudo R-squared (McFadden's)
-            null_model = logit(y, sm.add_constant(np.ones(len(y)))).fit(disp=False)
-            pseudo_r2 = 1 - (model.llf / null_model.llf)
+            # The intercept-only model's log-likelihood is closed form, so the likelihood-ratio test
+            # and McFadden's pseudo R-squared need no second fit (statsmodels' llnull would run one)
+            n = len(y)
+            p_hat = y.mean()
+            llf_null = n * (p_hat * np.log(p_hat) + (1 - p_hat) * np.log(1 - p_hat))
+            llr = 2 * (model.llf - llf_null)
+            llr_pvalue = special.chdtrc(1, llr)
+            pseudo_r2 = 1 - (model.llf / llf_null)
             
             return {
                 'test_name': 'Logistic Regression',
-                'statistic': 'LR chi2: ' + str(float(model.llr)),
-                'p_value': float(model.llr_pvalue),
+                'statistic': 'LR chi2: ' + str(float(llr)),
+                'p_value': float(llr_pvalue),
                 'df': 1,
                 'effect_size': {'type': "McFadden's Pseudo R-squared", 'value': float(pseudo_r2)},
                 'confidence_interval': {
@@ -788,7 +958,7 @@ class HypothesisAnalyzer:
                     'intercept': model.conf_int().loc['const'].tolist()
                 },
                 'alpha': self.alpha,
-                'decision': 'Significant relationship' if model.llr_pvalue < self.alpha else 'No significant relationship',
+                'decision': 'Significant relationship' if llr_pvalue < self.alpha else 'No significant relationship',
                 'sample_sizes': {'n': len(valid_data)},
                 'coefficients': {
                     'intercept': float(model.params['const']),
@@ -799,7 +969,7 @@ class HypothesisAnalyzer:
                 'missing_count': len(df) - len(valid_data),
                 'assumption_checks': {'binary_outcome': 'Yes', 'independence': 'Assumed'},
                 'visualizations': ['logistic_curve'],
-                'interpretation': f"A one-unit increase in {x_col} multiplies the odds of the outcome by {np.exp(model.params[x_col]) if x_col in model.params.index else 'N/A':.3f} (p = {model.llr_pvalue:.4f})",
+                'interpretation': f"A one-unit increase in {x_col} multiplies the odds of the outcome by {np.exp(model.params[x_col]) if x_col in model.params.index else 'N/A':.3f} (p = {llr_pvalue:.4f})",
                 'warnings': []
             }
         except Exception as e:
@@ -808,29 +978,39 @@ class HypothesisAnalyzer:
     def independent_ttest(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Independent t-test (assumes equal variances)"""
         try:
-            groups = df[group_col].dropna().unique()[:2]
-            group1 = df[df[group_col] == groups[0]][numeric_col].dropna()
-            group2 = df[df[group_col] == groups[1]][numeric_col].dropna()
+            group_values = self._split_groups(df, numeric_col, group_col)
+            if len(group_values) < 2:
+                return {'error': 'Need at least 2 groups'}
+            groups = list(group_values)[:2]
+            group1 = group_values[groups[0]]
+            group2 = group_values[groups[1]]
             
             if len(group1) < 2 or len(group2) < 2:
                 return {'error': 'Insufficient data in one or both groups'}
             
-            statistic, p_value = stats.ttest_ind(group1, group2, equal_var=True)
-            pooled_std = np.sqrt(((len(group1)-1)*group1.std()**2 + (len(group2)-1)*group2.std()**2) / (len(group1)+len(group2)-2))
-            cohens_d = (group1.mean() - group2.mean()) / pooled_std if pooled_std > 0 else 0
-            
-            levene_stat, levene_p = stats.levene(group1, group2)
+            # SciPy gets the raw arrays; the moments are computed once on them
+            values1, values2 = group1.to_numpy(), group2.to_numpy()
+            n1, n2 = values1.size, values2.size
+            statistic, p_value = stats.ttest_ind(values1, values2, equal_var=True)
+            pooled_std = np.sqrt(((n1-1)*values1.var(ddof=1) + (n2-1)*values2.var(ddof=1)) / (n1+n2-2))
+            cohens_d = (values1.mean() - values2.mean()) / pooled_std if pooled_std > 0 else 0
+            
+            (levene_stat, levene_p), normal1, normal2 = self._run_checks(n1 + n2, [
+                (stats.levene, (values1, values2)),
+                (self._check_normality, (group1,)),
+                (self._check_normality, (group2,))
+            ])
             assumptions = {
                 'equal_variance': {'statistic': float(levene_stat), 'p_value': float(levene_p), 'passed': levene_p > 0.05},
-                'normality_group1': self._check_normality(group1),
-                'normality_group2': self._check_normality(group2)
+                'normality_group1': normal1,
+                'normality_group2': normal2
             }
             
             return {
                 'test_name': 'Independent t-test',
                 'statistic': float(statistic),
                 'p_value': float(p_value),
-                'df': len(group1) + len(group2) - 2,
+                'df': n1 + n2 - 2,
                 'effect_size': {'type': "Cohen's d", 'value': float(cohens_d)},
                 'confidence_interval': {'level': f'{(1-self.alpha)*100}%', 'interval': 'N/A'},
                 'alpha': self.alpha,
@@ -872,15 +1052,16 @@ class HypothesisAnalyzer:
         """Sign test (non-parametric paired test)"""
         try:
             valid_data = df[[col1, col2]].dropna()
-            differences = valid_data[col1] - valid_data[col2]
-            differences = differences[differences != 0]
+            differences = (valid_data[col1] - valid_data[col2]).to_numpy()
             
-            if len(differences) < 5:
+            # Ties (zero differences) carry no sign and are dropped
+            n = np.count_nonzero(differences)
+            if n < 5:
                 return {'error': 'Insufficient non-zero differences'}
             
-            n_positive = (differences > 0).sum()
-            n = len(differences)
-            p_value = 2 * min(stats.binom.cdf(n_positive, n, 0.5), 1 - stats.binom.cdf(n_positive-1, n, 0.5))
+            n_positive = np.count_nonzero(differences > 0)
+            # Binomial(n, 0.5) tails from the bdtr/bdtrc ufuncs, skipping the rv_discrete dispatch
+            p_value = 2 * min(special.bdtr(n_positive, n, 0.5), special.bdtrc(n_positive - 1, n, 0.5))
             
             return {
                 'test_name': 'Sign Test',
@@ -932,7 +1113,7 @@ class HypothesisAnalyzer:
             if len(data) > 5000:
                 data = data.sample(5000, random_state=42)
                 
-            statistic, p_value = stats.shapiro(data)
+            statistic, p_value = _shapiro_wilk(data)
             
             return {
                 'test_name': 'Shapiro-Wilk Normality Test',
@@ -957,14 +1138,25 @@ class HypothesisAnalyzer:
             if len(data) < 3:
                 return {'error': 'Need at least 3 observations'}
             
-            if distribution == 'norm':
-                statistic, p_value = stats.kstest(data, 'norm', args=(data.mean(), data.std()))
-                dist_name = 'Normal'
-            elif distribution == 'uniform':
-                statistic, p_value = stats.kstest(data, 'uniform', args=(data.min(), data.max()-data.min()))
-                dist_name = 'Uniform'
-            else:
-                return {'error': f'Unsupported distribution: {distribution}'}
+            # Fitted CDF evaluated directly on the sorted sample, skipping kstest's frozen-distribution
+            # dispatch
+            x = np.sort(data.to_numpy(dtype=np.float64))
+            n = x.size
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if distribution == 'norm':
+                    cdf = special.ndtr((x - x.mean()) / x.std(ddof=1))
+                    dist_name = 'Normal'
+                elif distribution == 'uniform':
+                    cdf = np.clip((x - x[0]) / (x[-1] - x[0]), 0, 1)
+                    dist_name = 'Uniform'
+                else:
+                    return {'error': f'Unsupported distribution: {distribution}'}
+            
+            # Two-sided statistic and exact p-value, as kstest computes them
+            d_plus = (np.arange(1, n + 1) / n - cdf).max()
+            d_minus = (cdf - np.arange(n) / n).max()
+            statistic = max(d_plus, d_minus)
+            p_value = np.clip(stats.kstwo.sf(statistic, n), 0, 1)
             
             return {
                 'test_name': 'Kolmogorov-Smirnov Test',
@@ -1043,14 +1235,13 @@ class HypothesisAnalyzer:
     def levene_test(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Levene's test for equality of variances"""
         try:
-            valid_categories = df[group_col].dropna().unique()
-            groups = [df[df[group_col] == cat][numeric_col].dropna() for cat in valid_categories]
-            groups = [g for g in groups if len(g) > 0]
+            group_values = self._split_groups(df, numeric_col, group_col)
+            groups = [g for g in group_values.values() if len(g) > 0]
             
             if len(groups) < 2:
                 return {'error': 'Need at least 2 groups'}
             
-            statistic, p_value = stats.levene(*groups)
+            statistic, p_value = stats.levene(*(g.to_numpy() for g in groups))
             
             return {
                 'test_name': "Levene's Test for Equality of Variances",
@@ -1071,14 +1262,22 @@ class HypothesisAnalyzer:
     def bartlett_test(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Bartlett's test for equality of variances"""
         try:
-            valid_categories = df[group_col].dropna().unique()
-            groups = [df[df[group_col] == cat][numeric_col].dropna() for cat in valid_categories]
-            groups = [g for g in groups if len(g) > 0]
+            group_values = self._split_groups(df, numeric_col, group_col)
+            groups = [g for g in group_values.values() if len(g) > 0]
             
             if len(groups) < 2:
                 return {'error': 'Need at least 2 groups'}
             
-            statistic, p_value = stats.bartlett(*groups)
+            statistic, p_value = stats.bartlett(*(g.to_numpy() for g in groups))
+            
+            # Non-normality inflates Bartlett's false rejections, so the groups are only checked when
+            # it rejects; all() stops at the first non-normal group
+            warnings_list = []
+            if p_value < self.alpha:
+                checked = [g for g in groups if len(g) > 2]
+                n_total = sum(len(g) for g in checked)
+                if not all(self._run_checks(n_total, [(self._check_normality, (g,)) for g in checked])):
+                    warnings_list.append('Assumes normal distributions')
             
             return {
                 'test_name': "Bartlett's Test for Equality of Variances",
@@ -1092,7 +1291,7 @@ class HypothesisAnalyzer:
                 'sample_sizes': {str(i): len(g) for i, g in enumerate(groups)},
                 'interpretation': f"Bartlett's test: T = {statistic:.4f}, p = {p_value:.4f}. Variances {'differ significantly' if p_value < self.alpha else 'do not differ significantly'} across groups.",
                 'notes': 'More sensitive to normality than Levene test',
-                'warnings': ['Assumes normal distributions'] if not all(self._check_normality(g) for g in groups if len(g) > 2) else []
+                'warnings': warnings_list
             }
         except Exception as e:
             return {'error': str(e)}
@@ -1100,20 +1299,22 @@ class HypothesisAnalyzer:
     def mcnemar_test(self, df: pd.DataFrame, col1: str, col2: str) -> Dict[str, Any]:
         """McNemar's test for paired nominal data"""
         try:
-            contingency = pd.crosstab(df[col1], df[col2])
+            # Four counts from the shared factorize + bincount table (cached per column pair)
+            contingency = self._crosstab(df, col1, col2)
+            observed = contingency.to_numpy()
             
-            if contingency.shape != (2, 2):
+            if observed.shape != (2, 2):
                 return {'error': 'McNemar test requires 2x2 contingency table'}
             
-            b = contingency.iloc[0, 1]
-            c = contingency.iloc[1, 0]
+            b = int(observed[0, 1])
+            c = int(observed[1, 0])
             
             if b + c < 25:
                 statistic = (abs(b - c) - 1)**2 / (b + c) if (b + c) > 0 else 0
             else:
                 statistic = (b - c)**2 / (b + c) if (b + c) > 0 else 0
             
-            p_value = 1 - stats.chi2.cdf(statistic, 1)
+            p_value = special.chdtrc(1, statistic)
             
             return {
                 'test_name': "McNemar's Test",
@@ -1124,7 +1325,7 @@ class HypothesisAnalyzer:
                 'confidence_interval': {'level': 'N/A', 'interval': 'N/A'},
                 'alpha': self.alpha,
                 'decision': 'Significant change' if p_value < self.alpha else 'No significant change',
-                'sample_sizes': {'n': int(contingency.sum().sum()), 'discordant_pairs': int(b + c)},
+                'sample_sizes': {'n': int(observed.sum()), 'discordant_pairs': b + c},
                 'contingency_table': contingency.to_dict(),
                 'interpretation': f"McNemar's test: χ² = {statistic:.2f}, p = {p_value:.4f}. {'Significant' if p_value < self.alpha else 'No significant'} change in proportions.",
                 'notes': 'Used for paired nominal data (before/after designs)'
@@ -1135,14 +1336,17 @@ class HypothesisAnalyzer:
     def ks_two_sample(self, df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[str, Any]:
         """Kolmogorov-Smirnov two-sample test"""
         try:
-            groups = df[group_col].dropna().unique()[:2]
-            group1 = df[df[group_col] == groups[0]][numeric_col].dropna()
-            group2 = df[df[group_col] == groups[1]][numeric_col].dropna()
+            group_values = self._split_groups(df, numeric_col, group_col)
+            if len(group_values) < 2:
+                return {'error': 'Need at least 2 groups'}
+            groups = list(group_values)[:2]
+            group1 = group_values[groups[0]]
+            group2 = group_values[groups[1]]
             
             if len(group1) < 2 or len(group2) < 2:
                 return {'error': 'Insufficient data in one or both groups'}
             
-            statistic, p_value = stats.ks_2samp(group1, group2)
+            statistic, p_value = stats.ks_2samp(group1.to_numpy(), group2.to_numpy())
             
             return {
                 'test_name': 'Kolmogorov-Smirnov Two-Sample Test',
@@ -1193,6 +1397,38 @@ class HypothesisAnalyzer:
             return {'error': str(e)}
 
     # Helper methods
+    def _run_checks(self, n_total: int, checks: List[Tuple[Callable, tuple]]) -> List[Any]:
+        """Results of independent checks, in order. SciPy/NumPy release the GIL on large arrays,
+        so big samples run them on threads; small ones run inline."""
+        workers = min(self.max_workers or os.cpu_count() or 1, len(checks))
+        if workers > 1 and n_total >= PARALLEL_CHECKS_MIN_N:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(func, *args) for func, args in checks]
+                return [future.result() for future in futures]
+        return [func(*args) for func, args in checks]
+    
+    @staticmethod
+    def _split_groups(df: pd.DataFrame, numeric_col: str, group_col: str) -> Dict[Any, pd.Series]:
+        """Non-missing values of numeric_col per group, in order of first appearance, from a single
+        groupby pass; groups whose values are all missing are kept (empty)"""
+        grouped = df[numeric_col].groupby(df[group_col], sort=False, observed=True)
+        return {name: values.dropna() for name, values in grouped}
+    
+    @staticmethod
+    def _group_moments(group: pd.Series) -> Tuple[int, float, float]:
+        """(n, mean, sample std) of one group's values; NaN where undefined, as pandas reports them"""
+        values = group.to_numpy(dtype=np.float64)
+        n = values.size
+        mean = values.mean() if n > 0 else np.nan
+        std = values.std(ddof=1) if n > 1 else np.nan
+        return n, mean, std
+    
+    @staticmethod
+    def _valid_values(series: pd.Series) -> np.ndarray:
+        """Non-missing values of a numeric column as a float64 array"""
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return values[~np.isnan(values)]
+    
     def _infer_type(self, series: pd.Series) -> str:
         """Infer if column is numeric or categorical"""
         if pd.api.types.is_numeric_dtype(series):
@@ -1200,17 +1436,143 @@ class HypothesisAnalyzer:
         else:
             return 'categorical'
     
+    def _recommend_normality(self, data: pd.Series) -> bool:
+        """Normality verdict used only to pick a test: large samples skip the test and default
+        to the non-parametric branch instead of paying for an unreliable p-value"""
+        if len(data) > SHAPIRO_MAX_N:
+            return False
+        return self._check_normality(data)
+    
     def _check_normality(self, data: pd.Series, alpha: float = 0.05) -> bool:
-        """Check normality using Shapiro-Wilk test"""
+        """Check normality using Shapiro-Wilk, or D'Agostino's K-squared for large samples
+        (memoized on the values)"""
+        digest = self._content_key(data)
+        cache_key = None if digest is None else digest + (alpha,)
+        if cache_key is None:
+            return self._normality_verdict(data, alpha)
+        
+        with self._cache_lock:
+            cached = self.normality_cache.get(cache_key)
+            if cached is not None:
+                self.normality_cache.move_to_end(cache_key)
+                return cached
+        
+        normal = self._normality_verdict(data, alpha)
+        
+        with self._cache_lock:
+            self.normality_cache[cache_key] = normal
+            while len(self.normality_cache) > self.max_cached_normality:
+                self.normality_cache.popitem(last=False)
+        return normal
+    
+    @staticmethod
+    def _content_key(data: pd.Series) -> Optional[Tuple[str, int, str]]:
+        """Cache key from the values alone (the index never changes a verdict computed from them);
+        None for non-numeric data, whose bytes are object pointers"""
+        values = np.asarray(data)
+        if values.dtype.kind not in 'biuf':
+            return None
+        digest = hashlib.blake2b(np.ascontiguousarray(values).data, digest_size=16).hexdigest()
+        return (values.dtype.str, len(values), digest)
+    
+    @classmethod
+    def _column_identity(cls, data: pd.Series) -> Optional[Tuple[tuple, Any]]:
+        """Cache key for a column plus the object to keep alive alongside it. Arrow-backed columns
+        (e.g. the default string dtype) are keyed by their immutable buffers in O(1), since hashing
+        strings costs more than the crosstab it would save; numeric columns by content. Anything
+        else (object arrays) is not cacheable."""
+        values = data.array
+        if isinstance(values, pd.arrays.ArrowExtensionArray):
+            arrow = values.__arrow_array__()
+            key = [str(data.dtype)]
+            for chunk in getattr(arrow, 'chunks', [arrow]):
+                key.append((chunk.offset, len(chunk)) + tuple(
+                    (buffer.address, buffer.size) if buffer is not None else None for buffer in chunk.buffers()
+                ))
+            return tuple(key), arrow
+        digest = cls._content_key(data)
+        if digest is None:
+            return None
+        return digest, None
+    
+    def _crosstab(self, df: pd.DataFrame, col1: str, col2: str) -> pd.DataFrame:
+        """Contingency table of df[col1] by df[col2], memoized per column pair; callers must not
+        modify it"""
+        if self.max_cached_crosstabs <= 0:
+            return self._contingency_table(df[col1], df[col2])
+        ident1 = self._column_identity(df[col1])
+        ident2 = self._column_identity(df[col2])
+        if ident1 is None or ident2 is None:
+            return self._contingency_table(df[col1], df[col2])
+        cache_key = (col1, col2, ident1[0], ident2[0])
+        
+        with self._cache_lock:
+            cached = self._crosstab_cache.get(cache_key)
+            if cached is not None:
+                self._crosstab_cache.move_to_end(cache_key)
+                return cached[1]
+        
+        contingency = self._contingency_table(df[col1], df[col2])
+        
+        with self._cache_lock:
+            self._crosstab_cache[cache_key] = ((ident1[1], ident2[1]), contingency)
+            while len(self._crosstab_cache) > self.max_cached_crosstabs:
+                self._crosstab_cache.popitem(last=False)
+        return contingency
+    
+    @staticmethod
+    def _contingency_table(data1: pd.Series, data2: pd.Series) -> pd.DataFrame:
+        """Same table as pd.crosstab(data1, data2) from one factorize per column and a bincount,
+        skipping crosstab's groupby and unstack"""
+        codes1, levels1 = pd.factorize(data1, sort=True)
+        codes2, levels2 = pd.factorize(data2, sort=True)
+        valid = (codes1 >= 0) & (codes2 >= 0)
+        n_cols = len(levels2)
+        counts = np.bincount(
+            codes1[valid] * n_cols + codes2[valid], minlength=len(levels1) * n_cols
+        ).reshape(len(levels1), n_cols)
+        
+        # Like crosstab, keep only levels seen alongside a non-missing partner
+        rows = counts.any(axis=1)
+        cols = counts.any(axis=0)
+        return pd.DataFrame(
+            counts[rows][:, cols],
+            index=pd.Index(levels1[rows], name=data1.name),
+            columns=pd.Index(levels2[cols], name=data2.name)
+        )
+    
+    def _ranks(self, col_name: str, data: pd.Series) -> np.ndarray:
+        """Average ranks of `data`, memoized per column name and values"""
+        digest = self._content_key(data)
+        if digest is None:
+            return stats.rankdata(data, method='average')
+        cache_key = (col_name,) + digest
+        
+        with self._cache_lock:
+            cached = self._rank_cache.get(cache_key)
+            if cached is not None:
+                self._rank_cache.move_to_end(cache_key)
+                return cached
+        
+        ranks = stats.rankdata(np.asarray(data), method='average')
+        
+        with self._cache_lock:
+            self._rank_cache[cache_key] = ranks
+            while len(self._rank_cache) > self.max_cached_ranks:
+                self._rank_cache.popitem(last=False)
+        return ranks
+    
+    def _normality_verdict(self, data: pd.Series, alpha: float) -> bool:
+        """True when normality is not rejected at `alpha`"""
         if len(data) < 3:
             return False
         
-        # Use Shapiro-Wilk test (limit to 5000 samples for performance)
-        if len(data) > 5000:
-            data = data.sample(5000, random_state=42)
-        
         try:
-            _, p_value = stats.shapiro(data)
+            # Shapiro-Wilk up to its documented limit; D'Agostino's K-squared is O(n) beyond it
+            if len(data) <= SHAPIRO_MAX_N:
+                _, p_value = _shapiro_wilk(data)
+            else:
+                _, p_value = stats.normaltest(data)
             return p_value > alpha
         except:
             return False
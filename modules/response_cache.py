@@ -0,0 +1,46 @@
+"""
+In-process cache for LLM responses so repeated prompts skip the Groq round trip
+"""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+def normalize_question(text: str) -> str:
+    """Fold case and whitespace so trivially different phrasings share a cache entry"""
+    return " ".join(text.lower().split())
+
+
+class ResponseCache:
+    """Bounded, thread-safe LRU of completion text keyed by the exact request payload"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(**request: Any) -> str:
+        payload = json.dumps(request, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+# Shared by every assistant: keys embed the full prompt (dataset context included),
+# so entries never leak between datasets that differ.
+RESPONSE_CACHE = ResponseCache()
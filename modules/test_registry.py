@@ -74,20 +74,12 @@ class TestRegistry:
             return {'error': str(e)}
     
     def get_ai_metadata(self) -> str:
-        """Get formatted metadata for AI consumption"""
-        output = []
-        for test in self._tests.values():
-            output.append(f"""
-Test ID: {test.test_id}
-Name: {test.name}
-Category: {test.category}
-Type: {test.subcategory}
-Description: {test.description}
-Requirements: {test.input_requirements}
-Use case: {test.example_use_case}
-Assumptions: {', '.join(test.assumptions)}
----""")
-        return '\n'.join(output)
+        """Get compact one-line-per-test metadata for AI consumption"""
+        return '\n'.join(
+            f"- {test.test_id}: {test.name} ({test.category}, {test.subcategory}) - "
+            f"{test.description}; needs {test.input_requirements}"
+            for test in self._tests.values()
+        )
 
 # Global registry instance
 TEST_REGISTRY = TestRegistry()
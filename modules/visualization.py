@@ -45,7 +45,7 @@ class DataVisualizer:
         fig = go.Figure(data=go.Heatmap(
             z=missing_matrix.values.T,
             y=missing_matrix.columns,
-            x=missing_matrix.index,
+            x=missing_matrix.index.to_numpy(),
             colorscale=[[0, 'lightblue'], [1, 'red']],
             showscale=True,
             colorbar=dict(title="Missing Values", tickvals=[0, 1], ticktext=["Present", "Missing"])
@@ -345,7 +345,7 @@ class DataVisualizer:
         
         # Create heatmap
         fig = go.Figure(data=go.Heatmap(
-            z=corr_matrix.values,
+            z=corr_matrix.values.astype(np.float32),
             x=corr_matrix.columns,
             y=corr_matrix.columns,
             colorscale='RdBu',
@@ -243,7 +243,7 @@ with tab1:
                                     create_backup()
                                     
                                     modified_df, summary = detector.replace_anomaly(
-                                        df.copy(),
+                                        df,
                                         anomaly['row_index'],
                                         selected_column,
                                         new_value
@@ -289,7 +289,7 @@ with tab1:
                     
                     replacements = {a['row_index']: batch_value for a in anomaly_data['anomalies']}
                     modified_df, summary = detector.batch_replace_anomalies(
-                        df.copy(),
+                        df,
                         selected_column,
                         replacements
                     )
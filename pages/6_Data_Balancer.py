@@ -21,7 +21,10 @@ if st.session_state.dataset is None:
 
 df = st.session_state.dataset
 
-balancer = DataBalancer()
+# Kept across reruns so its encoded-target cache survives trying one method after another
+if 'data_balancer' not in st.session_state:
+    st.session_state.data_balancer = DataBalancer()
+balancer = st.session_state.data_balancer
 
 if 'balanced_data' not in st.session_state:
     st.session_state.balanced_data = None
@@ -324,6 +327,9 @@ if st.session_state.balancing_result:
     
     result = st.session_state.balancing_result
     
+    if result.get('skipped'):
+        st.info(result['message'])
+    
     col_metrics1, col_metrics2, col_metrics3 = st.columns(3)
     
     with col_metrics1:
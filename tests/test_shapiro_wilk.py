@@ -0,0 +1,59 @@
+"""Compare the cached-weight Shapiro-Wilk port against scipy.stats.shapiro."""
+import os
+import sys
+import warnings
+
+import numpy as np
+from scipy import stats
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.hypothesis_analysis import _shapiro_wilk
+
+SIZES = [3, 4, 5, 7, 11, 12, 20, 50, 100, 500, 1000, 2000, 5000]
+
+SAMPLERS = {
+    'normal': lambda rng, n: rng.normal(loc=10.0, scale=3.0, size=n),
+    'skewed': lambda rng, n: rng.lognormal(size=n),
+    'tied': lambda rng, n: rng.integers(0, 5, size=n).astype(float),
+    'constant': lambda rng, n: np.full(n, 2.5),
+}
+
+# scipy's swilk works in single precision and the port in double precision.
+W_ATOL = 1e-5
+
+
+def _p_atol(n):
+    return 5e-3 if n <= 1000 else 2e-2
+
+
+def _compare(kind, n, seed):
+    rng = np.random.default_rng(seed)
+    data = SAMPLERS[kind](rng, n)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected_w, expected_p = stats.shapiro(data)
+    w, p = _shapiro_wilk(data)
+    np.testing.assert_allclose(w, expected_w, rtol=0, atol=W_ATOL, err_msg=f'W, {kind}, n={n}')
+    np.testing.assert_allclose(p, expected_p, rtol=0, atol=_p_atol(n), err_msg=f'p, {kind}, n={n}')
+
+
+def test_shapiro_wilk_matches_scipy():
+    for kind in SAMPLERS:
+        for n in SIZES:
+            for seed in range(5):
+                _compare(kind, n, seed)
+
+
+def test_shapiro_wilk_rejects_short_samples():
+    try:
+        _shapiro_wilk(np.array([1.0, 2.0]))
+    except ValueError:
+        return
+    raise AssertionError('expected ValueError for fewer than 3 values')
+
+
+if __name__ == '__main__':
+    test_shapiro_wilk_matches_scipy()
+    test_shapiro_wilk_rejects_short_samples()
+    print('ok')